@@ -0,0 +1,220 @@
+# Bounded-suboptimal and anytime searches for callers with a latency budget.
+# Weighted A* orders the states by g + w * h, so it finds a solution much sooner and its
+# cost is at most w times the optimal. Anytime search (ARA*) starts with a large w and,
+# while the budget lasts, lowers it and repairs the previous search instead of starting
+# over, publishing a better solution and a tighter bound after every pass.
+#
+# Both return (solution, explored states, bound), where the cost of the solution is proven
+# to be at most bound times the optimal. The bound of a pass is the smaller of w and the
+# solution cost divided by the lowest g + h among the states still open or inconsistent,
+# which is a lower bound of the optimal cost.
+
+import heapq
+from time import time, perf_counter
+from astar import determine_goal_state, print_board_solution, get_manhattan_tables, neighbor_table
+from idastar import board_heuristic
+
+# Share of the time limit kept to free the tables and heaps once the search stops. Freeing them takes
+# time in proportion to the states reached, as reaching them did, so the share doesn't depend on the
+# machine (freeing took 5-6% of the search time on CPython 3.11; the share leaves twice that)
+RELEASE_SHARE = 0.1
+
+
+def anytime_search(given_state, n, weight=3.0, final_weight=1.0, weight_step=0.5, verbose=False, getTime=False,
+                   heuristic='m', time_limit=None, node_limit=None, stats=None):
+    """
+    Perform anytime repairing A* (ARA*) to solve the sliding puzzle.
+    Args:
+        given_state (list): The initial state of the puzzle.
+        n (int): The size of the puzzle (n x n).
+        weight (float): The weight of the heuristic in the first pass.
+        final_weight (float): The weight of the last pass (1 for an optimal last pass).
+        weight_step (float): How much the weight is lowered after every pass.
+        verbose (bool): Whether to print the solution.
+        getTime (bool): Whether to measure and print the time taken.
+        heuristic (str): The heuristic to use ('m' for Manhattan, 'd' for disjoint pattern database,
+            'l' for linear conflict, 'w' for walking distance).
+        time_limit (float): The number of seconds the search may take, unlimited if None.
+        node_limit (int): The number of states the search may expand, unlimited if None.
+        stats (SearchStats): Statistics to fill in and hooks to call; nothing is measured if None.
+    Returns:
+        tuple: The best solution found, the number of expanded states and the suboptimality
+            bound of the solution (1.0 when proven optimal), or None if the budget ran out
+            before the first solution.
+    """
+    start_time = time()
+    search_start = perf_counter()
+    deadline = search_start + time_limit * (1 - RELEASE_SHARE) if time_limit is not None else None
+    goal = tuple(determine_goal_state(given_state, n))
+    moves_table = neighbor_table(n)
+
+    if heuristic == 'm' and 'a' not in goal:
+        # Manhattan distance updated per move from the delta table
+        distances, deltas = get_manhattan_tables(list(goal), n)
+        estimate = None
+        root_h = sum(distances[tile][x] for x, tile in enumerate(given_state) if tile != 0)
+    else:
+        estimate = board_heuristic(list(goal), n, heuristic)
+        root_h = estimate(list(given_state))
+
+    root = tuple(given_state)
+    costs = {root: 0}  # Best g found for every state reached
+    estimates = {root: root_h}  # h of every state reached
+    parents = {root: None}  # (parent state, direction) for every state reached
+    closed = set()
+    inconsistent = set()  # Closed states whose g improved during the current pass
+    heap = []
+    lower_heap = []  # The open states by g + h, for the lower bound of the optimal cost
+    lower_inconsistent = float('inf')  # The lowest g + h of the inconsistent states
+    counter = 0
+    expanded = 0
+
+    def entry(state, blank):
+        nonlocal counter
+        counter += 1
+        return costs[state] + w * estimates[state], counter, costs[state], state, blank
+
+    def push(state, blank):
+        item = entry(state, blank)
+        heapq.heappush(heap, item)
+        heapq.heappush(lower_heap, (item[2] + estimates[state], item[1], item[2], state))
+
+    def path(state):
+        directions = []
+        while parents[state] is not None:
+            state, direction = parents[state]
+            directions.append(direction)
+        directions.reverse()
+        return directions
+
+    def out_of_budget(reserve=0.0):
+        if node_limit is not None and expanded >= node_limit:
+            return True
+        return deadline is not None and perf_counter() + reserve > deadline
+
+    w = weight
+    push(root, root.index(0))
+    best = None  # (solution, bound) of the last complete pass
+    repair_time = None  # Seconds per open state of the last repair
+    exhausted = False
+
+    while True:
+        # One weighted pass: expand until no open state can improve the incumbent at this weight
+        while heap:
+            f, _, g, state, blank = heap[0]
+            if state in closed or g > costs[state]:
+                heapq.heappop(heap)  # Stale entry
+                continue
+            if costs.get(goal, float('inf')) <= f:
+                break
+            if out_of_budget():
+                exhausted = True
+                break
+
+            heapq.heappop(heap)
+            closed.add(state)
+            expanded += 1
+            if stats is not None:
+                stats.expanded(state)
+
+            for _, direction, x in moves_table[blank]:
+                board = list(state)
+                tile = board[x]
+                board[blank], board[x] = tile, 0
+                child = tuple(board)
+                child_g = g + 1
+                if stats is not None:
+                    stats.nodes_generated += 1
+                if child_g >= costs.get(child, child_g + 1):
+                    if stats is not None:
+                        stats.duplicates_skipped += 1
+                    continue
+
+                costs[child] = child_g
+                parents[child] = (state, direction)
+                if child not in estimates:
+                    estimates[child] = estimate(board) if estimate is not None else \
+                        estimates[state] + deltas[tile][x][direction]
+                if child in closed:
+                    inconsistent.add(child)  # Reopened in the next pass, not this one
+                    lower_inconsistent = min(lower_inconsistent, child_g + estimates[child])
+                else:
+                    push(child, x)
+            if stats is not None:
+                stats.peak_open = max(stats.peak_open, len(heap))
+
+        if goal in costs:
+            # Lower bound of the optimal cost from the states that are still open or inconsistent
+            while lower_heap and (lower_heap[0][3] in closed or lower_heap[0][2] > costs[lower_heap[0][3]]):
+                heapq.heappop(lower_heap)  # Stale entry
+            lower_bound = min(lower_heap[0][0] if lower_heap else costs[goal], lower_inconsistent)
+            bound = costs[goal] / lower_bound if lower_bound else 1.0
+            if not exhausted:
+                bound = min(bound, w)  # A complete pass proves w as well
+            if best is not None:
+                bound = min(bound, best[1])  # The incumbent only gets cheaper
+            best = (path(goal), max(1.0, bound))
+            if verbose:
+                print("Weight {}: solution of {} moves, at most {:.3f} times the optimal.".format(
+                    w, costs[goal], best[1]))
+            if exhausted or best[1] == 1.0 or w <= final_weight:
+                break
+        # A repair that can't finish within the budget would only delay the answer. Until one is
+        # measured, it is estimated from the time per expansion so far (a repair does less per state)
+        if repair_time is None:
+            repair_time = (perf_counter() - search_start) / max(1, expanded)
+        if exhausted or (not heap and not inconsistent) or \
+                out_of_budget(repair_time * (len(heap) + len(inconsistent))):
+            break
+
+        # Lower the weight and repair: reopen the inconsistent states and reorder the open list
+        repair_start = perf_counter()
+        w = max(final_weight, w - weight_step)
+        states = {item[3]: item[4] for item in heap if item[3] not in closed and item[2] == costs[item[3]]}
+        states.update((state, state.index(0)) for state in inconsistent)
+        heap = [entry(state, blank) for state, blank in states.items()]
+        heapq.heapify(heap)
+        lower_heap = [(item[2] + estimates[item[3]], item[1], item[2], item[3]) for item in heap]
+        heapq.heapify(lower_heap)
+        closed = set()
+        inconsistent = set()
+        lower_inconsistent = float('inf')
+        repair_time = (perf_counter() - repair_start) / max(1, len(heap))
+
+    if stats is not None:
+        if best is not None:
+            stats.solved(goal, best[0])
+        else:
+            stats.finished()
+    if best is None:
+        print(f"No solution found within the budget. Time taken: {time() - start_time} seconds")
+        return None
+
+    solution, bound = best
+    if verbose:
+        print_board_solution(given_state, solution)
+    if getTime:
+        print(f"Time taken: {time() - start_time} seconds")
+    return solution, expanded, bound
+
+
+def weighted_a_star_search(given_state, n, weight=2.0, verbose=False, getTime=False, heuristic='m',
+                           time_limit=None, node_limit=None, stats=None):
+    """
+    Perform weighted A* search (f = g + weight * h) to solve the sliding puzzle.
+    Args:
+        given_state (list): The initial state of the puzzle.
+        n (int): The size of the puzzle (n x n).
+        weight (float): The weight of the heuristic; the solution costs at most weight times the optimal.
+        verbose (bool): Whether to print the solution.
+        getTime (bool): Whether to measure and print the time taken.
+        heuristic (str): The heuristic to use ('m', 'd', 'l' or 'w', see anytime_search).
+        time_limit (float): The number of seconds the search may take, unlimited if None.
+        node_limit (int): The number of states the search may expand, unlimited if None.
+        stats (SearchStats): Statistics to fill in and hooks to call; nothing is measured if None.
+    Returns:
+        tuple: The solution, the number of expanded states and the suboptimality bound,
+            or None if the budget ran out first.
+    """
+    return anytime_search(given_state, n, weight=weight, final_weight=weight, verbose=verbose, getTime=getTime,
+                          heuristic=heuristic, time_limit=time_limit, node_limit=node_limit, stats=stats)
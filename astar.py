@@ -1,39 +1,142 @@
 from queue import PriorityQueue
-from time import time
-from conection_database import select_heuristic_by_state, create_connection
-
-# Global variable to store memoized heuristic values
-memoized_heuristics = {}
+from time import time, perf_counter
+from math import isqrt
+from conection_database import create_pattern_database_connection
+from pattern_database import open_distance_table, open_or_build_pattern_database, \
+    goal_pattern_database_path, pattern_positions, rank_positions, UNVISITED
+from bucket_queue import BucketQueue
+from heuristic_cache import HeuristicCache
+import heuristic_tables
+
+# Global variable to store the pattern database heuristic values of the process
+# (pass a HeuristicCache to a_star_search to scope the cache to one search instead)
+heuristic_cache = HeuristicCache(max_size=1000000)
+heuristic_cache_source = None  # The pattern databases the process cache holds the values of
+
+# Global variable to store the pattern databases opened for each goal pattern
+pattern_databases = {}
+
+# Global variable to store the Manhattan distance and delta tables built for each goal
+manhattan_tables = {}
+
+# Global variable to store the exact distance tables opened for each puzzle size
+distance_tables = {}
+
+def get_manhattan_tables(goal, n):
+    """
+    Get the Manhattan distance tables for a goal, building them on first use.
+    Args:
+        goal (list): The goal state of the puzzle.
+        n (int): The size of the puzzle (n x n).
+    Returns:
+        tuple: The distance table (for every tile, its distance to the goal from each position)
+        and the delta table (for every tile and position, the change of its distance when
+        the blank moves into it, by direction of the blank).
+    """
+    key = tuple(goal)
+    if key not in manhattan_tables:
+        # Offset of the cell the tile slides to, by direction of the blank
+        offsets = {'←': 1, '→': -1, '↑': n, '↓': -n}
+        distances = {}
+        deltas = {}
+        for tile in goal:
+            if tile == 0 or tile == 'a':
+                continue
+            target = goal.index(tile)
+            distances[tile] = [abs(x // n - target // n) + abs(x % n - target % n) for x in range(n * n)]
+            deltas[tile] = []
+            for x in range(n * n):
+                position_deltas = {}
+                for direction, offset in offsets.items():
+                    if 0 <= x + offset < n * n:
+                        position_deltas[direction] = distances[tile][x + offset] - distances[tile][x]
+                deltas[tile].append(position_deltas)
+        manhattan_tables[key] = (distances, deltas)
+    return manhattan_tables[key]
+
+# Global variable to store the moves of the blank built for each n
+neighbor_tables = {}
+
+def neighbor_table(n):
+    """
+    Get the moves of the blank for every position, shared by all the states of a size.
+    Args:
+        n (int): The size of the puzzle (n x n).
+    Returns:
+        list: For every blank position, a list of (move, direction, new blank position) tuples,
+        the move being the index of the direction in State.DIRECTIONS.
+    """
+    if n not in neighbor_tables:
+        table = []
+        for x in range(n * n):
+            moves = []
+            if x % n != 0:
+                moves.append((0, '←', x - 1))
+            if x % n != n - 1:
+                moves.append((1, '→', x + 1))
+            if x - n >= 0:
+                moves.append((2, '↑', x - n))
+            if x + n < n * n:
+                moves.append((3, '↓', x + n))
+            table.append(moves)
+        neighbor_tables[n] = table
+    return neighbor_tables[n]
+
+# Direction that undoes each move of the blank
+INVERSE_DIRECTIONS = {'←': '→', '→': '←', '↑': '↓', '↓': '↑'}
 
 class State:
     DIRECTIONS = ['←', '→', '↑', '↓']
+    INVERSE_MOVES = [1, 0, 3, 2]  # Index of the direction that undoes each direction
+
+    # Nodes are created by the million, so they hold no per-node lists or dictionaries
+    __slots__ = ('state', 'parent', 'move', 'blank', 'depth', 'cost', 'goal', 'n', 'manhattan')
 
-    def __init__(self, state, parent, direction, depth, cost, goal, n):
+    def __init__(self, state, parent, move, depth, cost, goal, n, blank=None):
         """
         Initialize a state with relevant information.
         Args:
-            state (list): The current state of the puzzle.
+            state (list): The current state of the puzzle (stored as a tuple).
             parent (State): The parent state.
-            direction (str): The direction to reach this state.
+            move (int): The index in DIRECTIONS of the direction to reach this state (None for the root).
             depth (int): The depth of this state in the search tree.
             cost (int): The cost to reach this state.
-            goal (list): The goal state of the puzzle.
+            goal (list): The goal state of the puzzle (stored as a tuple).
             n (int): The size of the puzzle (n x n).
+            blank (int): The position of the blank, found in the state if None.
         """
-        self.state = state
+        self.state = state if type(state) is tuple else tuple(state)
         self.parent = parent
-        self.direction = direction
+        self.move = move
+        self.blank = self.state.index(0) if blank is None else blank
         self.depth = depth
-        self.goal = goal
+        self.goal = goal if type(goal) is tuple else tuple(goal)
         self.n = n
-        self.valid_moves = self.calculate_valid_moves()
-        self.state_tuple = tuple(self.state)
+        self.manhattan = None  # Manhattan distance, set incrementally by the parent once known
 
         if parent:
             self.cost = parent.cost + cost
         else:
             self.cost = cost
 
+    @property
+    def key(self):
+        """
+        The hashable representation of the state used in the explored set.
+        """
+        return self.state
+
+    @property
+    def direction(self):
+        """
+        The direction to reach this state, None for the root.
+        """
+        return None if self.move is None else State.DIRECTIONS[self.move]
+
+    @property
+    def valid_moves(self):
+        return self.calculate_valid_moves()
+
     def has_letters(self):
         """
         Check if the puzzle state contains letters (for modified Manhattan distance heuristic).
@@ -56,21 +159,16 @@ class State:
     def manhattan_distance(self):
         """
         Calculate the Manhattan distance heuristic for the current state.
+        Children of an evaluated state get their distance from the parent's in O(1)
+        (see expand), so it's only computed tile by tile for the root.
         Returns:
             int: The heuristic value.
         """
-        if self.state_tuple in memoized_heuristics:
-            return memoized_heuristics[self.state_tuple]
-
-        heuristic = 0
-        for i in range(1, self.n * self.n):
-            distance = abs(self.state_tuple.index(i) - self.goal.index(i))
-            heuristic = heuristic + distance // self.n + distance % self.n
-
-        a_star_evaluation = heuristic + self.cost
+        if self.manhattan is None:
+            distances = get_manhattan_tables(self.goal, self.n)[0]
+            self.manhattan = sum(distances[tile][x] for x, tile in enumerate(self.state) if tile != 0)
 
-        memoized_heuristics[self.state_tuple] = a_star_evaluation  # Memoize the heuristic value
-        return a_star_evaluation
+        return self.manhattan + self.cost
 
     def manhattan_modified(self):
         """
@@ -78,9 +176,6 @@ class State:
         Returns:
             int: The heuristic value.
         """
-        if self.state_tuple in memoized_heuristics:
-            return memoized_heuristics[self.state_tuple]
-
         heuristic = 0
         for i in range(1, self.n * self.n):
             if i != 'a':
@@ -88,48 +183,69 @@ class State:
                 heuristic += distance
 
         AStar_evaluation = heuristic + self.cost
-        memoized_heuristics[self.state_tuple] = AStar_evaluation
         return AStar_evaluation
     
-    def disjoint_pattern_database(self,conn):
+    def disjoint_pattern_database(self, conn, cache=None):
         """
         Calculate the heuristic value for the current puzzle state using a disjoint pattern database.
         Args:
-            conn: A database connection for accessing pattern databases.
+            conn (DisjointPatternDatabase): The additive memory-mapped pattern databases.
+            cache (HeuristicCache): The cache of heuristic values (the process cache if None).
         Returns:
             int: The heuristic value.
         """
-        if self.state_tuple in memoized_heuristics:
-            return memoized_heuristics[self.state_tuple]
-        heuristic= select_heuristic_by_state(conn, self.state)
-        
+        if cache is None:
+            cache = process_cache(conn)
+
+        heuristic = cache.get(self.key)
+        if heuristic is None:
+            heuristic = conn.heuristic(self.state)
+            cache.put(self.key, heuristic)
+
         AStar_evaluation = heuristic + self.cost
-        memoized_heuristics[self.state_tuple] = AStar_evaluation
         return AStar_evaluation
+
+    def linear_conflict(self):
+        """
+        Calculate the Manhattan distance plus the linear conflicts of the rows and columns.
+        Returns:
+            int: The heuristic value.
+        """
+        return self.manhattan_distance() + heuristic_tables.linear_conflict(self.state, self.n)
+
+    def walking_distance(self):
+        """
+        Calculate the walking distance heuristic (row moves plus column moves) for the current state.
+        Returns:
+            int: The heuristic value.
+        """
+        return heuristic_tables.walking_distance(self.state, self.n) + self.cost
     
     def expand(self):
         """
-        Generate child states by applying valid moves to the current puzzle state.
+        Generate child states by applying valid moves to the current puzzle state,
+        except the move that undoes the one reaching it.
         Returns:
             list: A list of child states.
         """
-        x = self.state.index(0)
-        moves = self.valid_moves  # Use the precalculated valid moves
+        x = self.blank
         children = []
-
-        for direction in moves:
-            temp = self.state[:]  # Create a shallow copy of the current state
-
-            if direction == '←':  # Left
-                temp[x], temp[x - 1] = temp[x - 1], temp[x]
-            elif direction == '→':  # Right
-                temp[x], temp[x + 1] = temp[x + 1], temp[x]
-            elif direction == '↑':  # Up
-                temp[x], temp[x - self.n] = temp[x - self.n], temp[x]
-            elif direction == '↓':  # Down
-                temp[x], temp[x + self.n] = temp[x + self.n], temp[x]
-
-            children.append(State(temp, self, direction, self.depth + 1, 1, self.goal, self.n))
+        if self.manhattan is not None:
+            deltas = get_manhattan_tables(self.goal, self.n)[1]
+        inverse = None if self.move is None else State.INVERSE_MOVES[self.move]
+
+        for move, direction, y in neighbor_table(self.n)[x]:
+            if move == inverse:
+                continue  # Undoing the previous move only leads back to the parent
+            temp = list(self.state)
+            tile = temp[y]
+            temp[x], temp[y] = tile, 0
+
+            child = State(tuple(temp), self, move, self.depth + 1, 1, self.goal, self.n, y)
+            if self.manhattan is not None:
+                # Only the tile that slid into the old blank position changes its distance
+                child.manhattan = self.manhattan + deltas[tile][y][direction]
+            children.append(child)
 
         return children
 
@@ -151,89 +267,387 @@ class State:
 
     def calculate_valid_moves(self):
         """
-        Calculate and return a list of valid moves (directions) that can be applied to the current state.
+        Get the valid moves (directions) that can be applied to the current state.
         Returns:
             list: A list of valid moves (e.g., ['←', '↑', '↓']).
         """
-        x = self.state.index(0)
-        valid_moves = State.DIRECTIONS.copy()
+        return [direction for _, direction, _ in neighbor_table(self.n)[self.blank]]
+
+def cell_bits(n):
+    """
+    Number of bits used for every cell of a packed board (4 up to 4x4).
+    Args:
+        n (int): The size of the puzzle (n x n).
+    Returns:
+        int: The bits per cell.
+    """
+    return max(4, (n * n - 1).bit_length())
+
+def pack_state(state, n):
+    """
+    Pack a puzzle state into a single integer, cell i taking bits [i * bits, (i + 1) * bits).
+    Args:
+        state (list): The puzzle state (numbers only).
+        n (int): The size of the puzzle (n x n).
+    Returns:
+        int: The packed state.
+    """
+    bits = cell_bits(n)
+    code = 0
+    for i, tile in enumerate(state):
+        code |= tile << (i * bits)
+    return code
+
+def unpack_state(code, n):
+    """
+    Unpack an integer created by pack_state back into a list.
+    Args:
+        code (int): The packed state.
+        n (int): The size of the puzzle (n x n).
+    Returns:
+        list: The puzzle state.
+    """
+    bits = cell_bits(n)
+    mask = (1 << bits) - 1
+    return [(code >> (i * bits)) & mask for i in range(n * n)]
+
+# Global variable to store the packed move table built for each n
+packed_move_tables = {}
+
+def packed_moves(n):
+    """
+    Get the moves of the blank for every position, as used on packed boards.
+    Args:
+        n (int): The size of the puzzle (n x n).
+    Returns:
+        list: For every blank position, a list of (direction, new blank position, shift of the
+        new blank position, shift of the current blank position) tuples.
+    """
+    if n not in packed_move_tables:
+        bits = cell_bits(n)
+        packed_move_tables[n] = [[(direction, y, y * bits, x * bits) for _, direction, y in moves]
+                                 for x, moves in enumerate(neighbor_table(n))]
+    return packed_move_tables[n]
+
+class PackedState:
+    """
+    Search node that stores the board packed in one integer.
+    Moves are shift and mask operations, and hashing and equality in the explored set
+    are integer operations. Only boards without 'a' placeholders can be packed.
+    """
+    __slots__ = ('code', 'blank', 'parent', 'direction', 'depth', 'cost', 'goal', 'goal_code', 'n', 'manhattan')
+
+    def __init__(self, code, blank, parent, direction, depth, cost, goal, goal_code, n):
+        """
+        Initialize a packed state with relevant information.
+        Args:
+            code (int): The packed state of the puzzle (see pack_state).
+            blank (int): The position of the blank.
+            parent (PackedState): The parent state.
+            direction (str): The direction to reach this state.
+            depth (int): The depth of this state in the search tree.
+            cost (int): The cost to reach this state.
+            goal (list): The goal state of the puzzle.
+            goal_code (int): The packed goal state.
+            n (int): The size of the puzzle (n x n).
+        """
+        self.code = code
+        self.blank = blank
+        self.parent = parent
+        self.direction = direction
+        self.depth = depth
+        self.goal = goal
+        self.goal_code = goal_code
+        self.n = n
+        self.manhattan = None  # Manhattan distance, set incrementally by the parent once known
+
+        if parent:
+            self.cost = parent.cost + cost
+        else:
+            self.cost = cost
+
+    @property
+    def key(self):
+        """
+        The hashable representation of the state used in the explored set.
+        """
+        return self.code
 
-        if x % self.n == 0:
-            valid_moves.remove('←')  # Left
-        if x % self.n == self.n - 1:
-            valid_moves.remove('→')  # Right
-        if x - self.n < 0:
-            valid_moves.remove('↑')  # Up
-        if x + self.n > self.n * self.n - 1:
-            valid_moves.remove('↓')  # Down
+    @property
+    def state(self):
+        """
+        The puzzle state as a list.
+        """
+        return unpack_state(self.code, self.n)
+
+    def has_letters(self):
+        return False
+
+    def is_goal(self):
+        return self.code == self.goal_code
+
+    def manhattan_distance(self):
+        """
+        Calculate the Manhattan distance heuristic for the current state.
+        Returns:
+            int: The heuristic value.
+        """
+        if self.manhattan is None:
+            distances = get_manhattan_tables(self.goal, self.n)[0]
+            self.manhattan = sum(distances[tile][x] for x, tile in enumerate(self.state) if tile != 0)
+
+        return self.manhattan + self.cost
+
+    def expand(self):
+        """
+        Generate child states by sliding the tile next to the blank into it,
+        except the move that undoes the one reaching it.
+        Returns:
+            list: A list of child states.
+        """
+        children = []
+        mask = (1 << cell_bits(self.n)) - 1
+        if self.manhattan is not None:
+            deltas = get_manhattan_tables(self.goal, self.n)[1]
+        inverse = INVERSE_DIRECTIONS.get(self.direction)
+        for direction, x, x_shift, blank_shift in packed_moves(self.n)[self.blank]:
+            if direction == inverse:
+                continue  # Undoing the previous move only leads back to the parent
+            tile = (self.code >> x_shift) & mask
+            code = self.code - (tile << x_shift) + (tile << blank_shift)
+            child = PackedState(code, x, self, direction, self.depth + 1, 1, self.goal, self.goal_code, self.n)
+            if self.manhattan is not None:
+                child.manhattan = self.manhattan + deltas[tile][x][direction]
+            children.append(child)
+        return children
 
-        return valid_moves
+    disjoint_pattern_database = State.disjoint_pattern_database
+    linear_conflict = State.linear_conflict
+    walking_distance = State.walking_distance
+    solution = State.solution
 
-def a_star_search(given_state, n, verbose=False, getTime=False,heuristic='m'):
+def get_distance_table(n):
+    """
+    Get the exact distance table of a puzzle size, opening (or building) it on first use.
+    Args:
+        n (int): The size of the puzzle (n x n).
+    Returns:
+        PatternDatabase: The table returned by open_distance_table.
+    """
+    if n not in distance_tables:
+        distance_tables[n] = open_distance_table(n)
+    return distance_tables[n]
+
+def follow_distance_table(given_state, n, table):
+    """
+    Solve a state without searching by always moving the blank to a child one step closer to the goal.
+    Args:
+        given_state (list): The initial state of the puzzle (without 'a' placeholders).
+        n (int): The size of the puzzle (n x n).
+        table (PatternDatabase): The exact distance table of the puzzle size.
+    Returns:
+        list: An optimal solution, or None if the state is unsolvable.
+    """
+    board = list(given_state)
+    positions = pattern_positions(board, table.tiles)  # Positions of the tiles 1..n*n-1, then the blank
+    size = n * n
+    distance = table.cost(rank_positions(positions, size))
+    if distance == UNVISITED:
+        return None
+
+    solution = []
+    moves_table = packed_moves(n)
+    while distance > 0:
+        distance -= 1
+        blank = positions[-1]
+        for direction, y, _, _ in moves_table[blank]:
+            tile = board[y]
+            positions[tile - 1], positions[-1] = blank, y
+            if table.cost(rank_positions(positions, size)) == distance:
+                board[blank], board[y] = tile, 0
+                solution.append(direction)
+                break
+            positions[tile - 1], positions[-1] = y, blank
+    return solution
+
+def process_cache(databases):
+    """
+    Get the process cache of heuristic values, emptied first if it holds the values of other
+    pattern databases (another puzzle size, or files opened again after being regenerated).
+    Args:
+        databases (DisjointPatternDatabase): The pattern databases the values are read from.
+    Returns:
+        HeuristicCache: The process cache.
+    """
+    global heuristic_cache_source
+    if databases is not heuristic_cache_source:
+        heuristic_cache.clear()
+        heuristic_cache_source = databases
+    return heuristic_cache
+
+def evaluate_state(state, heuristic, conn=None, cache=None):
+    """
+    Calculate the A* evaluation (heuristic plus cost) of a state.
+    Args:
+        state (State): The state to evaluate (a State or a PackedState).
+        heuristic (str): The heuristic to use ('m', 'd', 'l' or 'w', see a_star_search).
+        conn: The pattern database connection, needed by 'd'.
+        cache (HeuristicCache): The cache of pattern database values.
+    Returns:
+        int: The evaluation.
+    """
+    if state.has_letters():
+        return state.manhattan_modified()
+    if heuristic == 'd':
+        return state.disjoint_pattern_database(conn, cache)
+    if heuristic == 'l':
+        return state.linear_conflict()
+    if heuristic == 'w':
+        return state.walking_distance()
+    return state.manhattan_distance()
+
+def a_star_search(given_state, n, verbose=False, getTime=False,heuristic='m', packed=False, bucket_queue=False,
+                  cache=None, stats=None, distance_table=True):
     """
     Perform A* search to solve the sliding puzzle.
+    Complete 3x3 boards are solved without searching, by following the exact distance table.
     Args:
         given_state (list): The initial state of the puzzle.
         n (int): The size of the puzzle (n x n).
         verbose (bool): Whether to print the solution.
         getTime (bool): Whether to measure and print the time taken.
-        heuristic (str): The heuristic to use ('m' for Manhattan, 'd' for disjoint pattern database).
+        heuristic (str): The heuristic to use ('m' for Manhattan, 'd' for disjoint pattern database,
+            evaluated at every generated node from the additive databases, or Manhattan until they are
+            generated, 'l' for linear conflict, 'w' for walking distance).
+        packed (bool): Whether to store the states packed in integers (boards without 'a' only).
+        bucket_queue (bool): Whether to use a BucketQueue (buckets by f, LIFO on g, stale entries
+            skipped) as the open list instead of a PriorityQueue.
+        cache (HeuristicCache): The cache of pattern database values, the process cache if None.
+        stats (SearchStats): Statistics to fill in and hooks to call; nothing is measured if None.
+        distance_table (bool): Whether to use the exact distance table for complete 3x3 boards
+            (set it to False to measure the search itself).
     Returns:
         tuple: A tuple containing the solution and the number of explored states.
     """
     # Start measuring the time
     start_time = time()
-    frontier = PriorityQueue()
+    frontier = BucketQueue() if bucket_queue else PriorityQueue()
     explored = set()  # Use a set to store explored states
     counter = 0
     goal = determine_goal_state(given_state, n)
-    root = State(given_state, None, None, 0, 0, goal, n)
-    
-    # Convert the root state to a tuple for use in explored set
-    explored.add(tuple(root.state))
-    
-    if root.has_letters():
-        evaluation = root.manhattan_modified()
+    if packed:
+        root = PackedState(pack_state(given_state, n), given_state.index(0), None, None, 0, 0, goal, pack_state(goal, n), n)
     else:
-        if heuristic == 'd':
-             # Create a connection to the database
-            conn=create_connection()
-            evaluation = root.disjoint_pattern_database(conn)
-        elif heuristic == 'm':
-            evaluation = root.manhattan_distance()
+        root = State(given_state, None, None, 0, 0, goal, n)
     
-    frontier.put((evaluation, counter, root))
+    # Use the hashable key of the root state (tuple or packed integer) in the explored set
+    explored.add(root.key)
+
+    if distance_table and n == 3 and not root.has_letters():
+        solution = follow_distance_table(given_state, n, get_distance_table(n))
+        if solution is None:
+            print(f"No solution found. Time taken: {time() - start_time} seconds")
+            if stats is not None:
+                stats.finished()
+            return None
+        if verbose:
+            print_board_solution(given_state, solution)
+        if getTime:
+            print(f"Time taken: {time() - start_time} seconds")
+        if stats is not None:
+            stats.nodes_expanded = len(solution)
+            stats.solved(State(goal, None, None, len(solution), len(solution), goal, n), solution)
+        return solution, len(solution) + 1
+
+    conn = None
+    if heuristic == 'd' and not root.has_letters():
+        # Only the additive memory-mapped pattern databases are admissible (the costs of the SQLite
+        # database are not), so Manhattan is used until they are generated
+        conn = create_pattern_database_connection(n)
+        if conn is None:
+            heuristic = 'm'
+        elif cache is None:
+            cache = process_cache(conn)
+    if stats is not None:
+        used_cache = heuristic_cache if cache is None else cache
+        cache_hits, cache_misses = used_cache.hits, used_cache.misses
+
+    evaluation = evaluate_state(root, heuristic, conn, cache)
+    if bucket_queue:
+        frontier.put(evaluation, root.cost, root.key, root)
+    else:
+        frontier.put((evaluation, counter, root))
 
     while not frontier.empty():
-        current_node = frontier.get()
-        current_node = current_node[2]
-        explored.add(tuple(current_node.state))  # Convert the list to a tuple and add to explored set
+        if stats is not None:
+            clock = perf_counter()
+        if bucket_queue:
+            current_node = frontier.get()
+            if current_node is None:
+                break  # Only stale entries were left
+        else:
+            current_node = frontier.get()
+            current_node = current_node[2]
+        explored.add(current_node.key)  # Add the tuple or packed integer to the explored set
 
         if current_node.is_goal():
+            solution = current_node.solution()
             if verbose:
-                print_board_solution(given_state, current_node.solution())
+                print_board_solution(given_state, solution)
             # Calculate the time taken for this run
             end_time = time()
             elapsed_time = end_time - start_time
             if getTime:
                 print(f"Time taken: {elapsed_time} seconds")
-            return current_node.solution(), len(explored)
-
+            if stats is not None:
+                stats.cache_hits += used_cache.hits - cache_hits
+                stats.cache_misses += used_cache.misses - cache_misses
+                stats.solved(current_node, solution)
+            return solution, len(explored)
+
+        if stats is not None:
+            stats.queue_time += perf_counter() - clock
+            stats.expanded(current_node)
+            clock = perf_counter()
         children = current_node.expand()
+        if stats is not None:
+            stats.expansion_time += perf_counter() - clock
+            stats.nodes_generated += len(children)
+
         for child in children:
-            child_tuple = tuple(child.state)
-            if child_tuple not in explored:
+            if child.key not in explored:
                 counter += 1
-                if child.has_letters():
-                    evaluation = child.manhattan_modified()
+                if stats is None:
+                    evaluation = evaluate_state(child, heuristic, conn, cache)
+                    if bucket_queue:
+                        frontier.put(evaluation, child.cost, child.key, child)
+                    else:
+                        frontier.put((evaluation, counter, child))
+                    continue
+
+                clock = perf_counter()
+                evaluation = evaluate_state(child, heuristic, conn, cache)
+                stats.heuristic_time += perf_counter() - clock
+                clock = perf_counter()
+                if bucket_queue:
+                    if not frontier.put(evaluation, child.cost, child.key, child):
+                        stats.duplicates_skipped += 1
+                    stats.peak_open = max(stats.peak_open, len(frontier))
                 else:
-                    evaluation = child.manhattan_distance()
-                frontier.put((evaluation, counter, child))
+                    frontier.put((evaluation, counter, child))
+                    stats.peak_open = max(stats.peak_open, frontier.qsize())
+                stats.queue_time += perf_counter() - clock
+            elif stats is not None:
+                stats.duplicates_skipped += 1
 
     # Calculate the time taken if no solution is found
     end_time = time()
     elapsed_time = end_time - start_time
     print(f"No solution found. Time taken: {elapsed_time} seconds")
+    if stats is not None:
+        stats.cache_hits += used_cache.hits - cache_hits
+        stats.cache_misses += used_cache.misses - cache_misses
+        stats.finished()
     return None
 
 def print_state(state, n):
@@ -297,16 +711,38 @@ def inv_num(puzzle):
                 inv += 1
     return inv
 
-def solvable(puzzle):
+def solvable(puzzle, n=None):
     """
-    Check if the puzzle is solvable based on the inversion number.
+    Check if the puzzle is solvable, for any n.
+    Every move swaps the blank with a tile, so it flips the parity of the permutation of the
+    board (blank included) and of the distance from the blank to its goal position. A state is
+    solvable when both parities match, as they do at the goal. The permutation parity comes
+    from its cycle decomposition in O(n*n).
     Args:
         puzzle (list): The puzzle state.
+        n (int): The size of the puzzle (n x n), taken from the length of the puzzle if None.
     Returns:
         bool: True if solvable, False otherwise.
     """
-    inv_counter = inv_num(puzzle)
-    return inv_counter % 2 == 0
+    size = len(puzzle)
+    if n is None:
+        n = isqrt(size)
+
+    # Goal position of the content of every cell: tile t goes to t - 1 and the blank to the end
+    targets = [tile - 1 if tile else size - 1 for tile in puzzle]
+    visited = [False] * size
+    cycles = 0
+    for start in range(size):
+        if not visited[start]:
+            cycles += 1
+            x = start
+            while not visited[x]:
+                visited[x] = True
+                x = targets[x]
+
+    blank = targets.index(size - 1)
+    blank_distance = (n - 1 - blank // n) + (n - 1 - blank % n)
+    return (size - cycles) % 2 == blank_distance % 2
 
 
 
@@ -393,23 +829,36 @@ def determine_goal_state(pattern,n):
         GOAL_STATE_COMPLETE = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 0]
 
         if set(pattern) == set(GOAL_STATE_1):
-            print("Goal state 1")
             return GOAL_STATE_1
         elif set(pattern) == set(GOAL_STATE_2):
-            print("Goal state 2")
             return GOAL_STATE_2
-        elif set(pattern) == set(GOAL_STATE_2):
-            print("Goal state 3")
+        elif set(pattern) == set(GOAL_STATE_3):
             return GOAL_STATE_3
         elif set(pattern) == set(GOAL_STATE_COMPLETE):
-            print("Goal state complete")
             return GOAL_STATE_COMPLETE
         else:
             return "Pattern does not match any goal state"
 
+def get_pattern_database(pattern, n):
+    """
+    Get the pattern database for the goal of a pattern, opening it with mmap on first use.
+    The database is built and written to its file the first time any process needs it.
+    Args:
+        pattern (list): The input pattern.
+        n (int): The size of the puzzle (n x n).
+    Returns:
+        PatternDatabase: The database, indexed by the pattern tiles and the blank.
+    """
+    goal = determine_goal_state(pattern, n)
+    key = tuple(goal)
+    if key not in pattern_databases:
+        pattern_databases[key] = open_or_build_pattern_database(goal_pattern_database_path(goal, n), goal, n)
+    return pattern_databases[key]
+
 def number_of_moves(input_list,n):
     """
     Calculate the number of moves needed to solve a sliding puzzle for various patterns.
+    The costs are read from pattern databases filled by a single backward BFS per goal pattern.
     Args:
         input_list (list): The initial state of the puzzle.
         n (int): The size of the puzzle (n x n).
@@ -422,10 +871,7 @@ def number_of_moves(input_list,n):
     for pattern in patterns:
         result.append(pattern)
     for pattern in patterns:
-        #print('\n solving: ',pattern)
-        a_star_solution = a_star_search(pattern, n, verbose=False,heuristic='m')
-        number_of_moves = len(a_star_solution[0])
-        #print('\n cost: ',number_of_moves)
+        number_of_moves = get_pattern_database(pattern, n).lookup(pattern)
         result.append(number_of_moves)
         cost += number_of_moves
     result.append(cost)
@@ -0,0 +1,86 @@
+# Solves many boards at once across a pool of processes.
+# Every worker maps the binary pattern databases once when it starts; the files are
+# opened with mmap, so all the workers share a single copy in the OS page cache.
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import repeat
+import os
+from astar import a_star_search, solvable, get_distance_table
+from idastar import ida_star_search
+from bidirectional import bidirectional_search
+from anytime_search import anytime_search, weighted_a_star_search
+from conection_database import create_pattern_database_connection
+from heuristic_tables import linear_conflict, walking_distance
+
+ENGINES = {
+    'astar': a_star_search,
+    'ida': ida_star_search,
+    'bidirectional': bidirectional_search,
+    'weighted': weighted_a_star_search,
+    'anytime': anytime_search,
+}
+
+
+def attach_worker(n, heuristic):
+    """
+    Prepare a worker process: map the pattern databases or load the heuristic tables
+    before the first board arrives.
+    Args:
+        n (int): The size of the puzzle (n x n).
+        heuristic (str): The heuristic the boards are solved with.
+    """
+    if n == 3:
+        get_distance_table(n)  # a_star_search solves complete 3x3 boards from it
+    if heuristic == 'd':
+        create_pattern_database_connection(n)
+    elif heuristic == 'l':
+        linear_conflict(list(range(n * n)), n)
+    elif heuristic == 'w':
+        walking_distance(list(range(n * n)), n)
+
+
+def solve_one(state, n, heuristic, engine):
+    """
+    Solve a single board inside a worker.
+    Args:
+        state (list): The initial state of the puzzle.
+        n (int): The size of the puzzle (n x n).
+        heuristic (str): The heuristic to use ('m', 'd', 'l' or 'w').
+        engine (str): The search to use ('astar', 'ida' or 'bidirectional').
+    Returns:
+        tuple: The solution and the number of explored states, as returned by the engine,
+            or None if the board is not solvable.
+    """
+    if not solvable(state, n):
+        return None  # Searching would explore the whole reachable half of the space
+    return ENGINES[engine](state, n, heuristic=heuristic)
+
+
+def solve_many(states, n, heuristic='m', workers=None, engine='astar', ordered=True, chunksize=8):
+    """
+    Solve many boards in parallel, streaming the results back as a generator.
+    Args:
+        states (list): The initial states of the puzzles.
+        n (int): The size of the puzzle (n x n).
+        heuristic (str): The heuristic to use ('m' for Manhattan, 'd' for disjoint pattern database,
+            'l' for linear conflict, 'w' for walking distance).
+        workers (int): The number of processes (the number of CPUs if None).
+        engine (str): The search to use ('astar', 'ida' or 'bidirectional').
+        ordered (bool): Whether to yield the results in the order of the states, or as they complete.
+        chunksize (int): The number of boards sent to a worker at once when ordered.
+    Yields:
+        The result of every board if ordered, else (index of the board, result) pairs.
+    """
+    if engine not in ENGINES:
+        raise ValueError("Unknown engine: {}".format(engine))
+
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers, initializer=attach_worker, initargs=(n, heuristic)) as executor:
+        if ordered:
+            yield from executor.map(solve_one, states, repeat(n), repeat(heuristic), repeat(engine),
+                                    chunksize=chunksize)
+        else:
+            futures = {executor.submit(solve_one, state, n, heuristic, engine): index
+                       for index, state in enumerate(states)}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
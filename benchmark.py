@@ -0,0 +1,244 @@
+# Reproducible benchmark of the solvers.
+# Runs every engine/heuristic combination over a fixed instance set, each combination in
+# a fresh process so its peak memory is measured alone, and writes the results as JSON.
+#
+# Instance sets:
+#   8puzzle-all     every one of the 181,440 solvable 3x3 states
+#   8puzzle-sample  a stratified sample of 3x3 states, the same number per optimal depth
+#   15puzzle-walk   4x4 states from seeded random walks of a fixed length
+#   korf100         Korf's 100 15-puzzle instances, from korf100.txt in the usual
+#                   "id tiles... optimal length" format (blank as 0, goal 0..15; --korf-file)
+
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import json
+import platform
+import random
+import resource
+from time import perf_counter, strftime
+from astar import a_star_search, neighbor_table
+from idastar import ida_star_search
+from bidirectional import bidirectional_search
+from anytime_search import anytime_search, weighted_a_star_search
+from hda_star import hda_star_search
+from solvable_states import solvable_states
+
+ENGINES = {
+    'astar': partial(a_star_search, distance_table=False),
+    'astar-bucket': partial(a_star_search, bucket_queue=True, distance_table=False),
+    'astar-packed': partial(a_star_search, packed=True, bucket_queue=True, distance_table=False),
+    'astar-table': a_star_search,
+    'ida': ida_star_search,
+    'bidirectional': bidirectional_search,
+    'weighted': weighted_a_star_search,
+    'anytime': partial(anytime_search, time_limit=1.0),
+    'hda': hda_star_search,
+}
+
+
+def all_eight_puzzles():
+    """
+    Get every solvable 3x3 state.
+    Returns:
+        list: The 181,440 states.
+    """
+    return [puzzle for puzzles in solvable_states(3) for puzzle in puzzles]
+
+
+def eight_puzzle_sample(per_depth, seed):
+    """
+    Get a sample of 3x3 states with the same number of states for every optimal depth.
+    The depths come from a breadth-first search from the goal over the whole space.
+    Args:
+        per_depth (int): The number of states sampled for each depth (all of them if fewer).
+        seed (int): The seed of the random sample.
+    Returns:
+        list: The sampled states, by increasing depth.
+    """
+    goal = (1, 2, 3, 4, 5, 6, 7, 8, 0)
+    moves_table = neighbor_table(3)
+    layers = [[goal]]
+    seen = {goal}
+    queue = deque([(goal, 8, 0)])
+    while queue:
+        state, blank, depth = queue.popleft()
+        for _, _, x in moves_table[blank]:
+            board = list(state)
+            board[blank], board[x] = board[x], 0
+            child = tuple(board)
+            if child not in seen:
+                seen.add(child)
+                if len(layers) == depth + 1:
+                    layers.append([])
+                layers[depth + 1].append(child)
+                queue.append((child, x, depth + 1))
+
+    rng = random.Random(seed)
+    sample = []
+    for layer in layers:
+        sample += [list(state) for state in rng.sample(layer, min(per_depth, len(layer)))]
+    return sample
+
+
+def random_walk_puzzles(n, count, length, seed):
+    """
+    Get states generated by random walks of the blank from the goal, never undoing a move.
+    Args:
+        n (int): The size of the puzzle (n x n).
+        count (int): The number of states.
+        length (int): The number of moves of every walk.
+        seed (int): The seed of the walks.
+    Returns:
+        list: The states.
+    """
+    rng = random.Random(seed)
+    moves_table = neighbor_table(n)
+    puzzles = []
+    for _ in range(count):
+        board = list(range(1, n * n)) + [0]
+        blank = n * n - 1
+        previous = None
+        for _ in range(length):
+            x = rng.choice([x for _, _, x in moves_table[blank] if x != previous])
+            board[blank], board[x] = board[x], 0
+            previous, blank = blank, x
+        puzzles.append(board)
+    return puzzles
+
+
+def load_korf_instances(path):
+    """
+    Read Korf's 15-puzzle instances and convert them to the goal used here.
+    Korf's goal has the blank first (0, 1, ..., 15); rotating the board 180 degrees and
+    relabeling every tile t as 16 - t maps it to (1, ..., 15, 0) and keeps the optimal
+    solution length.
+    Args:
+        path (str): A file with one instance per line: an id followed by the 16 tiles
+            (any further numbers, like the optimal length in korf100.txt, are ignored).
+    Returns:
+        list: The converted states.
+    """
+    puzzles = []
+    with open(path) as file:
+        for line in file:
+            numbers = [int(x) for x in line.split()]
+            if len(numbers) < 17:
+                continue
+            tiles = numbers[1:17]
+            puzzles.append([16 - tile if tile else 0 for tile in reversed(tiles)])
+    return puzzles
+
+
+def run_combination(engine, heuristic, puzzles, n):
+    """
+    Solve every puzzle with one engine and heuristic (meant to run in its own process).
+    Args:
+        engine (str): The name of the engine in ENGINES.
+        heuristic (str): The heuristic option of the engine.
+        puzzles (list): The states to solve.
+        n (int): The size of the puzzle (n x n).
+    Returns:
+        dict: The measurements of the combination.
+    """
+    solve = ENGINES[engine]
+    instances = []
+    start_time = perf_counter()
+    for index, puzzle in enumerate(puzzles):
+        instance_start = perf_counter()
+        result = solve(puzzle, n, heuristic=heuristic)
+        elapsed_time = perf_counter() - instance_start
+        instances.append({
+            'index': index,
+            'solution_length': len(result[0]) if result else None,
+            'nodes_expanded': result[1] if result else None,
+            'wall_time': elapsed_time,
+        })
+    wall_time = perf_counter() - start_time
+
+    nodes = sum(instance['nodes_expanded'] or 0 for instance in instances)
+    return {
+        'engine': engine,
+        'heuristic': heuristic,
+        'instances': len(puzzles),
+        'nodes_expanded': nodes,
+        'nodes_per_second': nodes / wall_time if wall_time else 0.0,
+        'wall_time': wall_time,
+        'peak_rss_kb': max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                           resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss),  # HDA* workers
+        'solution_lengths': [instance['solution_length'] for instance in instances],
+        'per_instance': instances,
+    }
+
+
+def run_benchmark(instance_set, engines, heuristics, output, per_depth=20, count=50, length=40,
+                  seed=0, korf_file='korf100.txt'):
+    """
+    Run every engine/heuristic combination over an instance set and write the results as JSON.
+    Args:
+        instance_set (str): '8puzzle-all', '8puzzle-sample', '15puzzle-walk' or 'korf100'.
+        engines (list): The names of the engines in ENGINES.
+        heuristics (list): The heuristic options.
+        output (str): The JSON file to write.
+        per_depth (int): The states per depth of '8puzzle-sample'.
+        count (int): The number of states of '15puzzle-walk'.
+        length (int): The random walk length of '15puzzle-walk'.
+        seed (int): The seed of the sampled sets.
+        korf_file (str): The file with Korf's instances.
+    Returns:
+        dict: The results written.
+    """
+    if instance_set == '8puzzle-all':
+        n, puzzles = 3, all_eight_puzzles()
+    elif instance_set == '8puzzle-sample':
+        n, puzzles = 3, eight_puzzle_sample(per_depth, seed)
+    elif instance_set == '15puzzle-walk':
+        n, puzzles = 4, random_walk_puzzles(4, count, length, seed)
+    elif instance_set == 'korf100':
+        n, puzzles = 4, load_korf_instances(korf_file)
+    else:
+        raise ValueError("Unknown instance set: {}".format(instance_set))
+
+    report = {
+        'instance_set': instance_set,
+        'n': n,
+        'instances': len(puzzles),
+        'seed': seed,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'date': strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': [],
+    }
+    for engine in engines:
+        for heuristic in heuristics:
+            # A fresh process per combination, so caches and peak memory don't carry over
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                result = executor.submit(run_combination, engine, heuristic, puzzles, n).result()
+            report['results'].append(result)
+            print("{} / {}: {} nodes in {:.2f} seconds ({:.0f} nodes/s), peak RSS {} KB".format(
+                engine, heuristic, result['nodes_expanded'], result['wall_time'],
+                result['nodes_per_second'], result['peak_rss_kb']))
+
+    with open(output, 'w') as file:
+        json.dump(report, file, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the sliding puzzle solvers.")
+    parser.add_argument('--instances', default='8puzzle-sample',
+                        choices=['8puzzle-all', '8puzzle-sample', '15puzzle-walk', 'korf100'])
+    parser.add_argument('--engines', default='astar,astar-bucket,ida', help="comma-separated, from: " + ', '.join(ENGINES))
+    parser.add_argument('--heuristics', default='m', help="comma-separated, from: m, l, w, d")
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--per-depth', type=int, default=20)
+    parser.add_argument('--count', type=int, default=50)
+    parser.add_argument('--length', type=int, default=40)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--korf-file', default='korf100.txt')
+    args = parser.parse_args()
+
+    run_benchmark(args.instances, args.engines.split(','), args.heuristics.split(','), args.output,
+                  per_depth=args.per_depth, count=args.count, length=args.length, seed=args.seed,
+                  korf_file=args.korf_file)
@@ -0,0 +1,161 @@
+import heapq
+from time import time
+from astar import State, INVERSE_DIRECTIONS, determine_goal_state, print_board_solution, get_manhattan_tables, \
+    neighbor_table
+from idastar import board_heuristic
+
+
+class Frontier:
+    def __init__(self, root, target, n, estimate=None):
+        """
+        One direction of the bidirectional search: an A* frontier from root towards target.
+        Args:
+            root (list): The state the frontier grows from.
+            target (list): The state the frontier searches for.
+            n (int): The size of the puzzle (n x n).
+            estimate (function): A board heuristic towards target; when None the Manhattan
+                distance is used and updated per move from the delta table.
+        """
+        self.estimate = estimate
+        self.deltas = None
+        if estimate is None:
+            self.deltas = dict(get_manhattan_tables(target, n)[1])
+            # 'a' placeholders are interchangeable, moving one never changes the distance
+            self.deltas['a'] = [dict.fromkeys(State.DIRECTIONS, 0)] * (n * n)
+            distances = get_manhattan_tables(target, n)[0]
+            h = sum(distances[tile][x] for x, tile in enumerate(root) if tile != 0 and tile != 'a')
+        else:
+            h = estimate(root)
+
+        key = tuple(root)
+        self.costs = {key: 0}  # Best g found for every state reached
+        self.parents = {key: None}  # (parent state, direction) for every state reached
+        self.closed = set()
+        self.heap = [(h, 0, 0, h, key, root.index(0))]
+        self.counter = 0
+
+    def min_f(self):
+        """
+        Drop stale entries from the top of the heap and return the lowest f.
+        Returns:
+            float: The lowest f of the open states, or infinity if there are none.
+        """
+        heap = self.heap
+        while heap and (heap[0][4] in self.closed or heap[0][2] > self.costs[heap[0][4]]):
+            heapq.heappop(heap)
+        return heap[0][0] if heap else float('inf')
+
+    def expand(self, moves_table, other, best):
+        """
+        Expand the open state with the lowest f, checking every child against the other frontier.
+        Args:
+            moves_table (list): The moves of the blank returned by neighbor_table.
+            other (Frontier): The frontier of the opposite direction.
+            best (tuple): The (cost, meeting state) of the best solution found so far.
+        Returns:
+            tuple: The updated (cost, meeting state) of the best solution.
+        """
+        f, _, g, h, state, blank = heapq.heappop(self.heap)
+        self.closed.add(state)
+
+        for _, direction, x in moves_table[blank]:
+            parent = self.parents[state]
+            if parent is not None and direction == INVERSE_DIRECTIONS[parent[1]]:
+                continue  # Never undo the previous move
+
+            board = list(state)
+            tile = board[x]
+            board[blank], board[x] = tile, 0
+            child = tuple(board)
+            child_g = g + 1
+
+            if child_g >= self.costs.get(child, child_g + 1):
+                continue
+            self.costs[child] = child_g
+            self.parents[child] = (state, direction)
+            self.closed.discard(child)
+
+            if self.deltas is not None:
+                child_h = h + self.deltas[tile][x][direction]
+            else:
+                child_h = self.estimate(board)
+            self.counter += 1
+            heapq.heappush(self.heap, (child_g + child_h, self.counter, child_g, child_h, child, x))
+
+            if child in other.costs and child_g + other.costs[child] < best[0]:
+                best = (child_g + other.costs[child], child)
+
+        return best
+
+    def path(self, state):
+        """
+        Get the directions from the root of the frontier to a state.
+        Args:
+            state (tuple): A state reached by the frontier.
+        Returns:
+            list: The directions of the blank.
+        """
+        directions = []
+        while self.parents[state] is not None:
+            state, direction = self.parents[state]
+            directions.append(direction)
+        directions.reverse()
+        return directions
+
+
+def bidirectional_search(given_state, n, verbose=False, getTime=False, heuristic='m'):
+    """
+    Perform bidirectional A* search to solve the sliding puzzle.
+    One frontier grows forward from the given state with the chosen heuristic, the other
+    backward from the goal with the Manhattan distance to the given state, always expanding
+    the smaller one. The search stops once no open state on either side can lead to a
+    solution cheaper than the best meeting point found, which is then optimal.
+    Args:
+        given_state (list): The initial state of the puzzle.
+        n (int): The size of the puzzle (n x n).
+        verbose (bool): Whether to print the solution.
+        getTime (bool): Whether to measure and print the time taken.
+        heuristic (str): The heuristic of the forward search ('m' for Manhattan,
+            'd' for disjoint pattern database, 'l' for linear conflict, 'w' for walking distance).
+    Returns:
+        tuple: A tuple containing the solution and the number of expanded states.
+    """
+    start_time = time()
+    goal = determine_goal_state(given_state, n)
+    moves_table = neighbor_table(n)
+
+    estimate = None
+    if heuristic != 'm' and 'a' not in goal:
+        estimate = board_heuristic(goal, n, heuristic)
+    forward = Frontier(list(given_state), goal, n, estimate)
+    backward = Frontier(list(goal), list(given_state), n)
+
+    best = (float('inf'), None)
+    if tuple(given_state) == tuple(goal):
+        best = (0, tuple(goal))
+
+    while True:
+        forward_f = forward.min_f()
+        backward_f = backward.min_f()
+        if best[0] <= max(forward_f, backward_f):
+            break
+
+        if len(forward.heap) <= len(backward.heap):
+            best = forward.expand(moves_table, backward, best)
+        else:
+            best = backward.expand(moves_table, forward, best)
+
+    expanded = len(forward.closed) + len(backward.closed)
+    if best[1] is None:
+        print(f"No solution found. Time taken: {time() - start_time} seconds")
+        return None
+
+    # The backward path goes from the goal to the meeting state, undo it in reverse
+    solution = forward.path(best[1])
+    solution += [INVERSE_DIRECTIONS[direction] for direction in reversed(backward.path(best[1]))]
+
+    if verbose:
+        print_board_solution(given_state, solution)
+    if getTime:
+        print(f"Time taken: {time() - start_time} seconds")
+    return solution, expanded
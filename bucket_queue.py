@@ -0,0 +1,80 @@
+# Open list for A* on the sliding puzzle, where f-values are small integers.
+# It avoids the lock queue.PriorityQueue takes on every put/get and the
+# duplicate entries pushed for states reached again with a worse cost.
+
+
+class BucketQueue:
+    def __init__(self):
+        """
+        Create an empty queue. Entries are kept in buckets indexed by f, each bucket
+        holding one stack per g, so ties on f are broken in favour of the deepest
+        entry and, within the same g, the last one pushed (LIFO).
+        """
+        self.buckets = []  # buckets[f][g] is a stack of (key, item)
+        self.counts = []  # Number of entries (live or stale) in each bucket
+        self.best_cost = {}  # Lowest g pushed for every key
+        self.min_f = 0
+        self.size = 0
+
+    def put(self, f, g, key, item):
+        """
+        Push an item, unless its key was already pushed with a cost at least as low.
+        Args:
+            f (int): The evaluation of the item (g + h).
+            g (int): The cost to reach the item.
+            key: The hashable representation of the item's state.
+            item: The item to store (e.g. a State).
+        Returns:
+            bool: True if the item was pushed, False if it was discarded.
+        """
+        if self.best_cost.get(key, g + 1) <= g:
+            return False
+        self.best_cost[key] = g
+
+        while len(self.buckets) <= f:
+            self.buckets.append([])
+            self.counts.append(0)
+        bucket = self.buckets[f]
+        while len(bucket) <= g:
+            bucket.append([])
+
+        bucket[g].append((key, item))
+        self.counts[f] += 1
+        self.size += 1
+        if f < self.min_f:
+            self.min_f = f
+        return True
+
+    def _pop_entry(self):
+        """
+        Remove the entry with the lowest f and highest g, stale or not.
+        """
+        while self.counts[self.min_f] == 0:
+            self.min_f += 1
+
+        bucket = self.buckets[self.min_f]
+        while not bucket[-1]:
+            bucket.pop()  # Drop the emptied stacks of the highest g
+        g = len(bucket) - 1
+        key, item = bucket[g].pop()
+        self.counts[self.min_f] -= 1
+        self.size -= 1
+        return g, key, item
+
+    def get(self):
+        """
+        Pop the item with the lowest f, skipping entries superseded by a cheaper push.
+        Returns:
+            The item, or None if only stale entries were left.
+        """
+        while self.size:
+            g, key, item = self._pop_entry()
+            if self.best_cost[key] == g:
+                return item
+        return None
+
+    def empty(self):
+        return self.size == 0
+
+    def __len__(self):
+        return self.size
@@ -0,0 +1,43 @@
+# Generates the binary pattern databases used by a_star_search(heuristic='d').
+# Every pattern of create_patterns is solved by a single backward BFS and written
+# to pattern_database_nxn_i.pdb, which the solver opens with mmap.
+# By default only the moves of the pattern tiles are counted, so the costs of the
+# disjoint patterns can be added at every node of the search. Tables that count every
+# move (additive=False) are indexed by the blank too and can't be added, so they are
+# written under the blank-indexed names of the pattern solver instead.
+# With more than one worker every BFS layer is split across processes that share the table.
+# With a work directory the BFS keeps its layers on disk, for tables larger than memory,
+# and resumes from the last complete layer if it is interrupted.
+
+import os
+import time
+from astar import create_patterns, determine_goal_state
+from pattern_database import build_pattern_database, write_pattern_database, pattern_database_path, \
+    goal_pattern_database_path
+from parallel_pattern_database import build_pattern_database_parallel
+from external_pattern_database import build_pattern_database_external
+
+def build_pattern_databases(n=3, directory='.', additive=True, workers=1, work_dir=None):
+    goal_state = list(range(1, n * n)) + [0]
+    start_time = time.time()
+
+    for index, pattern in enumerate(create_patterns(goal_state, n), start=1):
+        goal_pattern = determine_goal_state(pattern, n)
+        if additive:
+            path = pattern_database_path(n, index, directory)
+        else:
+            path = goal_pattern_database_path(goal_pattern, n, directory)
+        if work_dir is not None:
+            build_pattern_database_external(goal_pattern, n, path, additive=additive,
+                                            work_dir=os.path.join(work_dir, 'pattern_{}'.format(index)), verbose=True)
+            continue
+        if workers == 1:
+            costs = build_pattern_database(goal_pattern, n, additive=additive, verbose=True)
+        else:
+            costs = build_pattern_database_parallel(goal_pattern, n, additive=additive, workers=workers, verbose=True)
+        write_pattern_database(path, costs, goal_pattern, n, with_blank=not additive)
+        print("Wrote {} ({} entries) in {:.2f} seconds.".format(path, len(costs), time.time() - start_time))
+
+if __name__ == "__main__":
+    n_size = int(input("Enter the n-size of the board: "))
+    build_pattern_databases(n=n_size, workers=os.cpu_count())
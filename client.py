@@ -13,7 +13,7 @@ for x in str(num):
   
 print("The given state is:", root)
 
-if solvable(root):
+if solvable(root, n):
     print("Solvable, please wait.\n")
 
     a_star_solution_manhattan = a_star_search(root, n=3, verbose=False, getTime=True,heuristic='m')  
@@ -2,6 +2,11 @@
 
 import sqlite3
 from sqlite3 import Error
+from pattern_database import open_pattern_databases
+
+# Global variable to keep the memory-mapped pattern databases open for each n
+pattern_database_connections = {}
+
 def create_connection():
     """ create a database connection to the SQLite database
         specified by the db_file
@@ -19,6 +24,20 @@ def create_connection():
     return conn
 
 
+def create_pattern_database_connection(n=3):
+    """ open the memory-mapped binary pattern databases for a puzzle size,
+        reusing them across searches in the same process
+    :param n: size of the puzzle (n x n)
+    :return: DisjointPatternDatabase object or None if the files were not generated
+    """
+    if n not in pattern_database_connections:
+        databases = open_pattern_databases(n)
+        if databases is None:
+            return None  # Not cached, so the files are picked up once they are generated
+        pattern_database_connections[n] = databases
+    return pattern_database_connections[n]
+
+
 def select_heuristic_by_state(conn, state):
     """
     Query tasks by priority
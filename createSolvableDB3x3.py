@@ -1,6 +1,5 @@
 import sqlite3
-from astar import solvable
-from itertools import permutations
+from solvable_states import solvable_states
 import os
 
 def create_database():
@@ -27,29 +26,22 @@ def create_database():
     conn.commit()
     conn.close()
 
-def generate_and_check_puzzles():
-    n = 3
-    goal_state = [1, 2, 3, 4, 5, 6, 7, 8, 0]
-
+def generate_and_check_puzzles(start=0, stop=None, chunk_size=10000):
+    # Only the solvable states are enumerated, by rank and one chunk at a time
     conn = sqlite3.connect('puzzle_database_3x3.db')
     cursor = conn.cursor()
 
-    all_puzzles = list(permutations(goal_state))
     solvable_count = 0  # Initialize a count for solvable puzzles
 
-    for puzzle in all_puzzles:
-        puzzle = list(puzzle)
-        puzzle_state = ','.join(map(str, puzzle))  # Convert the state to a comma-separated string
-
-        if solvable(puzzle):
-            # Insert the puzzle object into the database
-            cursor.execute('''
-                INSERT OR IGNORE INTO puzzles (state, visited, sub_state_1, sub_state_2, cost_1, cost_2, cost_total)
-                VALUES (?, 0, NULL, NULL, NULL, NULL, NULL)
-            ''', (puzzle_state,))
-            solvable_count += 1  # Increment the count for solvable puzzles
+    for puzzles in solvable_states(3, start, stop, chunk_size):
+        # Insert the chunk of puzzle objects into the database
+        cursor.executemany('''
+            INSERT OR IGNORE INTO puzzles (state, visited, sub_state_1, sub_state_2, cost_1, cost_2, cost_total)
+            VALUES (?, 0, NULL, NULL, NULL, NULL, NULL)
+        ''', ((','.join(map(str, puzzle)),) for puzzle in puzzles))
+        conn.commit()
+        solvable_count += len(puzzles)  # Increment the count for solvable puzzles
 
-    conn.commit()
     conn.close()
 
     print("\nTotal solvable puzzles:", solvable_count)  # Print the count of solvable puzzles
@@ -1,6 +1,5 @@
 import sqlite3
-from astar import solvable
-from itertools import permutations
+from solvable_states import solvable_states, count_solvable
 import os
 
 def create_database():
@@ -31,36 +30,32 @@ def create_database():
     print("Database created.")
     
 
-def generate_and_check_puzzles():
+def generate_and_check_puzzles(start=0, stop=None, chunk_size=100000):
+    # The 10,461,394,944,000 solvable states are enumerated by rank and one chunk at a time,
+    # so memory stays bounded; pass a rank range to fill only a part of the database
     print("Generating puzzles...")
-    goal_state = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 0]
+    if stop is None:
+        stop = count_solvable(4)
 
     conn = sqlite3.connect('puzzle_database_4x4.db')
     cursor = conn.cursor()
     print("Connected to database...")
 
-    all_puzzles = list(permutations(goal_state))
     solvable_count = 0  # Initialize a count for solvable puzzles
-        
-    print("Permutations generated...") 
 
-    # for puzzle in all_puzzles:
-    #     puzzle = list(puzzle)
-    #     puzzle_state = ','.join(map(str, puzzle))  # Convert the state to a comma-separated string
+    for puzzles in solvable_states(4, start, stop, chunk_size):
+        # Insert the chunk of puzzle objects into the database
+        cursor.executemany('''
+            INSERT OR IGNORE INTO puzzles (state, visited, sub_state_1, sub_state_2, sub_state_3, cost_1, cost_2, cost_3, cost_total)
+            VALUES (?, 0, NULL, NULL, NULL, NULL, NULL, NULL, NULL)
+        ''', ((','.join(map(str, puzzle)),) for puzzle in puzzles))
+        conn.commit()
+        solvable_count += len(puzzles)  # Increment the count for solvable puzzles
+        print("Inserted {} of {} puzzles.".format(solvable_count, stop - start))
 
-    #    if solvable(puzzle):
-    #         # Insert the puzzle object into the database
-    #         cursor.execute('''
-    #             INSERT OR IGNORE INTO puzzles (state, visited, sub_state_1, sub_state_2, sub_state_3, cost_1, cost_2, cost_3, cost_total)
-    #             VALUES (?, 0, NULL, NULL, NULL, NULL, NULL, NULL, NULL)
-    #         ''', (puzzle_state,))
-    #        print(puzzle)
-    #        solvable_count += 1  # Increment the count for solvable puzzles
-
-    # conn.commit()
-    # conn.close()
+    conn.close()
 
-    #print("\nTotal solvable puzzles:", solvable_count)  # Print the count of solvable puzzles
+    print("\nTotal solvable puzzles:", solvable_count)  # Print the count of solvable puzzles
 
 create_database()
 generate_and_check_puzzles()
\ No newline at end of file
@@ -0,0 +1,284 @@
+# External-memory BFS for pattern databases larger than RAM.
+# Every BFS layer is a file of sorted ranks (8 bytes each) in a work directory. The
+# successors of a layer are streamed into partition files by rank range, and each partition
+# is deduplicated with a bitmap of its range, minus the states of the current and previous
+# layers: the moves are reversible, so a child is either in one of those or new (Korf's
+# frontier search). Memory is bounded by the size of one partition, whatever the size of
+# the table, and the finished layers are recorded in a checkpoint so an interrupted build
+# resumes from the last complete layer.
+#
+# For additive databases a layer is closed under the free moves of the blank (a free
+# neighbor of a state has the same cost), adding one part file per closure round.
+# The final table is assembled by streaming the layers into a memory-mapped .pdb file.
+
+from array import array
+from bisect import bisect_left
+import json
+import mmap
+import os
+from time import time
+from astar import neighbor_table
+from pattern_database import (MAGIC, HEADER, FLAG_BLANK, UNVISITED, pattern_tiles, number_of_entries,
+                              rank_positions, unrank_positions, pattern_positions)
+
+RECORD_SIZE = array('Q').itemsize
+READ_CHUNK = 1 << 16  # Ranks read from a file at once
+
+
+def read_ranks(path):
+    """
+    Stream the ranks of a layer or partition file.
+    Args:
+        path (str): The file.
+    Yields:
+        array: Consecutive blocks of ranks.
+    """
+    with open(path, 'rb') as file:
+        while True:
+            block = array('Q')
+            block.frombytes(file.read(READ_CHUNK * RECORD_SIZE))
+            if not block:
+                break
+            yield block
+
+
+def ranks_in_range(path, start, stop):
+    """
+    Stream the ranks of a sorted file that are in [start, stop), found by binary search.
+    Args:
+        path (str): The sorted file.
+        start (int): The first rank.
+        stop (int): The rank after the last one.
+    Yields:
+        array: Consecutive blocks of ranks.
+    """
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        ranks = memoryview(data).cast('Q')
+        try:
+            i = bisect_left(ranks, start)
+            end = bisect_left(ranks, stop)
+            while i < end:
+                yield array('Q', ranks[i:min(i + READ_CHUNK, end)])
+                i += READ_CHUNK
+        finally:
+            ranks.release()
+
+
+def expand_to_partitions(sources, partition_paths, partition_size, n, k, moves, flush_size):
+    """
+    Write the successors of the states of some files into one file per rank range.
+    Args:
+        sources (list): The files of the states to expand.
+        partition_paths (list): The file of every partition.
+        partition_size (int): The number of ranks of every partition.
+        n (int): The size of the puzzle (n x n).
+        k (int): The number of pattern tiles.
+        moves (str): 'all', 'tile' (moves of pattern tiles) or 'free' (blank over non-pattern cells).
+        flush_size (int): The number of ranks buffered per partition before writing.
+    """
+    size = n * n
+    neighbors = neighbor_table(n)
+    buffers = [array('Q') for _ in partition_paths]
+    files = [open(path, 'wb') for path in partition_paths]
+    try:
+        for source in sources:
+            for block in read_ranks(source):
+                for rank in block:
+                    positions = unrank_positions(rank, size, k + 1)
+                    blank = positions[-1]
+                    for _, _, cell in neighbors[blank]:
+                        child = positions[:]
+                        if cell in positions:
+                            if moves == 'free':
+                                continue
+                            child[positions.index(cell)] = blank
+                        elif moves == 'tile':
+                            continue
+                        child[-1] = cell
+                        child_rank = rank_positions(child, size)
+                        buffer = buffers[child_rank // partition_size]
+                        buffer.append(child_rank)
+                        if len(buffer) >= flush_size:
+                            buffer.tofile(files[child_rank // partition_size])
+                            del buffer[:]
+        for buffer, file in zip(buffers, files):
+            buffer.tofile(file)
+    finally:
+        for file in files:
+            file.close()
+
+
+def merge_partitions(partition_paths, partition_size, entries, known_paths, output_path):
+    """
+    Deduplicate the partitions and remove the known states, writing the new states sorted.
+    Args:
+        partition_paths (list): The file of every partition, deleted once merged.
+        partition_size (int): The number of ranks of every partition.
+        entries (int): The number of states.
+        known_paths (list): The sorted files of the states already found that children may reach.
+        output_path (str): The file of the new states.
+    Returns:
+        int: The number of new states.
+    """
+    count = 0
+    with open(output_path, 'wb') as output:
+        for index, path in enumerate(partition_paths):
+            start = index * partition_size
+            stop = min(start + partition_size, entries)
+            bitmap = bytearray(stop - start)
+            for block in read_ranks(path):
+                for rank in block:
+                    bitmap[rank - start] = 1
+            os.remove(path)
+            for known_path in known_paths:
+                for block in ranks_in_range(known_path, start, stop):
+                    for rank in block:
+                        bitmap[rank - start] = 0
+
+            new = array('Q')
+            i = bitmap.find(1)
+            while i != -1:
+                new.append(start + i)
+                if len(new) >= READ_CHUNK:
+                    new.tofile(output)
+                    count += len(new)
+                    del new[:]
+                i = bitmap.find(1, i + 1)
+            new.tofile(output)
+            count += len(new)
+    return count
+
+
+def save_checkpoint(path, checkpoint):
+    # Written to a temporary file first, so an interruption never leaves half a checkpoint
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'w') as file:
+        json.dump(checkpoint, file)
+    os.replace(temporary_path, path)
+
+
+def write_external_table(path, layers, work_dir, goal_pattern, n, additive):
+    """
+    Assemble the pattern database file from the layer files.
+    Args:
+        path (str): The .pdb file to write (one byte per entry).
+        layers (list): The part files of every layer, by depth.
+        work_dir (str): The directory of the layer files.
+        goal_pattern (list): The goal pattern.
+        n (int): The size of the puzzle (n x n).
+        additive (bool): Whether the table is indexed by the tiles only.
+    """
+    size = n * n
+    tiles = pattern_tiles(goal_pattern)
+    k = len(tiles)
+    blank_radix = size - k
+    entries = number_of_entries(size, k if additive else k + 1)
+    offset = HEADER.size + k
+
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, n, k, 0 if additive else FLAG_BLANK))
+        file.write(bytes(tiles))
+        for start in range(0, entries, READ_CHUNK):
+            file.write(bytes([UNVISITED]) * min(READ_CHUNK, entries - start))
+
+    with open(temporary_path, 'r+b') as file, mmap.mmap(file.fileno(), 0) as data:
+        for depth, parts in enumerate(layers):
+            for part in parts:
+                for block in read_ranks(os.path.join(work_dir, part)):
+                    for rank in block:
+                        index = offset + (rank // blank_radix if additive else rank)
+                        if data[index] == UNVISITED:  # The first layer reaching a placement is its cost
+                            data[index] = depth
+        data.flush()
+    os.replace(temporary_path, path)
+
+
+def build_pattern_database_external(goal_pattern, n, path, additive=False, work_dir='pdb_work',
+                                    partition_size=1 << 26, verbose=False):
+    """
+    Build a pattern database with a disk-backed BFS and write it to a .pdb file.
+    Run it again with the same work directory to resume an interrupted build.
+    Args:
+        goal_pattern (list): The goal pattern, as returned by determine_goal_state.
+        n (int): The size of the puzzle (n x n).
+        path (str): The .pdb file to write, readable by PatternDatabase.
+        additive (bool): Whether to count only the moves of the pattern tiles.
+        work_dir (str): The directory of the layer files and the checkpoint.
+        partition_size (int): The number of ranks deduplicated at once (one byte of memory each).
+        verbose (bool): Whether to print the progress of every BFS layer.
+    """
+    start_time = time()
+    size = n * n
+    tiles = pattern_tiles(goal_pattern)
+    k = len(tiles)
+    entries = number_of_entries(size, k + 1)
+    partitions = (entries + partition_size - 1) // partition_size
+    partition_paths = [os.path.join(work_dir, 'partition_{}.bin'.format(i)) for i in range(partitions)]
+    flush_size = max(1024, partition_size // (RECORD_SIZE * partitions))
+
+    os.makedirs(work_dir, exist_ok=True)
+    checkpoint_path = os.path.join(work_dir, 'checkpoint.json')
+    parameters = {'goal_pattern': goal_pattern, 'n': n, 'additive': additive}
+    checkpoint = None
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path) as file:
+            checkpoint = json.load(file)
+        if checkpoint['parameters'] != parameters:
+            raise ValueError("{} holds the layers of another pattern database".format(work_dir))
+        if verbose:
+            print("Resuming after depth {}.".format(len(checkpoint['layers']) - 1))
+
+    def layer_path(name):
+        return os.path.join(work_dir, name)
+
+    def close_layer(depth, parts):
+        # Add the states the blank reaches for free, one part per round, until no new ones appear
+        round_number = len(parts)
+        frontier = parts[-1]
+        while True:
+            expand_to_partitions([layer_path(frontier)], partition_paths, partition_size, n, k, 'free', flush_size)
+            part = 'layer_{}_{}.bin'.format(depth, round_number)
+            if merge_partitions(partition_paths, partition_size, entries, [layer_path(p) for p in parts],
+                                layer_path(part)) == 0:
+                os.remove(layer_path(part))
+                return parts
+            parts.append(part)
+            frontier = part
+            round_number += 1
+
+    if checkpoint is None:
+        root = array('Q', [rank_positions(pattern_positions(goal_pattern, tiles), size)])
+        with open(layer_path('layer_0_0.bin'), 'wb') as file:
+            root.tofile(file)
+        layers = [['layer_0_0.bin']]
+        if additive:
+            layers[0] = close_layer(0, layers[0])
+        checkpoint = {'parameters': parameters, 'layers': layers, 'done': False}
+        save_checkpoint(checkpoint_path, checkpoint)
+    layers = checkpoint['layers']
+
+    while not checkpoint['done']:
+        depth = len(layers) - 1
+        known = layers[depth] + (layers[depth - 1] if depth > 0 else [])
+        expand_to_partitions([layer_path(p) for p in layers[depth]], partition_paths, partition_size, n, k,
+                             'tile' if additive else 'all', flush_size)
+        part = 'layer_{}_0.bin'.format(depth + 1)
+        count = merge_partitions(partition_paths, partition_size, entries, [layer_path(p) for p in known],
+                                 layer_path(part))
+        if count == 0:
+            os.remove(layer_path(part))
+            checkpoint['done'] = True
+        else:
+            parts = close_layer(depth + 1, [part]) if additive else [part]
+            layers.append(parts)
+            if verbose:
+                states = sum(os.path.getsize(layer_path(p)) for p in parts) // RECORD_SIZE
+                print("Depth {}: {} states in {:.2f} seconds.".format(depth + 1, states, time() - start_time))
+        save_checkpoint(checkpoint_path, checkpoint)
+
+    write_external_table(path, layers, work_dir, goal_pattern, n, additive)
+    if verbose:
+        print("Wrote {} in {:.2f} seconds.".format(path, time() - start_time))
@@ -0,0 +1,261 @@
+# Hash-distributed A* (HDA*): one A* search split across processes.
+# Every board belongs to the worker given by its hash, which keeps the open list and the best
+# g of its boards. A worker expanding a board sends each child to its owner, buffering the
+# children per owner and sending them in batches, and the owner keeps the child if it improves
+# the best g known (reopening the board if it was expanded already).
+#
+# The owner of the goal shares the cost of every better solution (the incumbent) with the
+# other workers, which skip the boards whose f reaches it. The search is over once every worker
+# is idle (nothing left under the incumbent) and no batch is in flight. The main process detects
+# this with waves of probes (Mattern's four counters): every worker answers whether it is idle
+# and how many batches it sent and received, and two consecutive waves with the same balanced
+# totals and only idle workers prove that nothing is left. As no board under the incumbent
+# is left unexpanded, the incumbent is optimal.
+#
+# The solution is traced back from the goal by asking the owner of every board for the
+# direction of the move that reached it with its best g.
+
+import heapq
+import multiprocessing
+from queue import Empty
+from time import time
+import zlib
+from astar import INVERSE_DIRECTIONS, determine_goal_state, print_board_solution, get_manhattan_tables, \
+    neighbor_table
+from idastar import board_heuristic
+
+
+def owner(state, workers):
+    """
+    Get the worker that owns a board.
+    Args:
+        state (tuple): The board.
+        workers (int): The number of workers.
+    Returns:
+        int: The index of the worker.
+    """
+    # hash() of the 'a' of pattern boards changes between spawned processes, a checksum of the tiles doesn't
+    return zlib.crc32(bytes(255 if tile == 'a' else tile for tile in state)) % workers
+
+
+def receive(replies, processes, timeout=1.0):
+    """
+    Wait for the next answer of the workers, failing instead of waiting forever if one of them died.
+    Args:
+        replies (Queue): The queue of the answers to the main process.
+        processes (list): The worker processes.
+        timeout (float): The seconds between two checks of the workers.
+    Returns:
+        tuple: The answer.
+    Raises:
+        RuntimeError: If a worker exited before answering.
+    """
+    while True:
+        try:
+            return replies.get(timeout=timeout)
+        except Empty:
+            for process in processes:
+                if not process.is_alive():
+                    raise RuntimeError("HDA* worker {} exited with code {}".format(process.name, process.exitcode))
+
+
+def hda_worker(index, inboxes, replies, root, root_h, goal, n, heuristic, batch_size):
+    """
+    Run one HDA* worker until the main process stops it.
+    Args:
+        index (int): The index of the worker.
+        inboxes (list): The message queue of every worker.
+        replies (Queue): The queue of the answers to the main process.
+        root (tuple): The initial board.
+        root_h (int): The heuristic value of the initial board.
+        goal (tuple): The goal board.
+        n (int): The size of the puzzle (n x n).
+        heuristic (str): The heuristic option.
+        batch_size (int): The number of boards expanded between two sends of the buffered children.
+    """
+    workers = len(inboxes)
+    inbox = inboxes[index]
+    moves_table = neighbor_table(n)
+    if heuristic == 'm' and 'a' not in goal:
+        deltas = get_manhattan_tables(list(goal), n)[1]
+        estimate = None
+    else:
+        estimate = board_heuristic(list(goal), n, heuristic)
+
+    costs = {}  # Best g of every owned board reached
+    parents = {}  # Direction of the move reaching every owned board with its best g
+    heap = []
+    counter = 0
+    incumbent = float('inf')
+    buffers = [[] for _ in range(workers)]
+    sent = received = expanded = 0
+
+    def insert(state, g, h, direction):
+        # Keep a board if it improves the best g known; the goal improves the incumbent
+        nonlocal counter, incumbent
+        if g >= costs.get(state, g + 1) or g + h >= incumbent:
+            return
+        costs[state] = g
+        parents[state] = direction
+        if state == goal:
+            incumbent = g
+            for other in range(workers):
+                if other != index:
+                    inboxes[other].put(('incumbent', g))
+            return
+        counter += 1
+        heapq.heappush(heap, (g + h, counter, g, h, state))
+
+    def has_work():
+        # Drop stale entries and those that can't beat the incumbent from the top of the heap
+        while heap and (heap[0][2] > costs[heap[0][4]] or heap[0][0] >= incumbent):
+            heapq.heappop(heap)
+        return bool(heap)
+
+    def flush():
+        nonlocal sent
+        for other, buffer in enumerate(buffers):
+            if buffer:
+                inboxes[other].put(('states', buffer))
+                buffers[other] = []
+                sent += 1
+
+    def handle(message):
+        # Returns False once the worker must stop
+        nonlocal received, incumbent
+        kind = message[0]
+        if kind == 'states':
+            received += 1
+            for state, g, h, direction in message[1]:
+                insert(state, g, h, direction)
+        elif kind == 'incumbent':
+            incumbent = min(incumbent, message[1])
+        elif kind == 'probe':
+            replies.put(('status', index, message[1], not has_work(), sent, received, incumbent))
+        elif kind == 'trace':
+            replies.put(('parent', parents[message[1]]))
+        elif kind == 'stop':
+            replies.put(('stopped', index, expanded))
+            return False
+        return True
+
+    if owner(root, workers) == index:
+        insert(root, 0, root_h, None)
+
+    while True:
+        if not has_work():
+            if not handle(inbox.get()):  # Idle: wait for work or control
+                return
+            continue
+        try:
+            while True:
+                if not handle(inbox.get_nowait()):
+                    return
+        except Empty:
+            pass
+
+        for _ in range(batch_size):
+            if not has_work():
+                break
+            _, _, g, h, state = heapq.heappop(heap)
+            expanded += 1
+            blank = state.index(0)
+            for _, direction, x in moves_table[blank]:
+                if direction == INVERSE_DIRECTIONS.get(parents[state]):
+                    continue  # Undoes the move that reached the board
+                board = list(state)
+                tile = board[x]
+                board[blank], board[x] = tile, 0
+                child = tuple(board)
+                child_h = estimate(board) if estimate is not None else h + deltas[tile][x][direction]
+                destination = owner(child, workers)
+                if destination == index:
+                    insert(child, g + 1, child_h, direction)
+                else:
+                    buffers[destination].append((child, g + 1, child_h, direction))
+        flush()
+
+
+def hda_star_search(given_state, n, verbose=False, getTime=False, heuristic='m', workers=None, batch_size=64):
+    """
+    Perform hash-distributed A* search across processes to solve the sliding puzzle.
+    Args:
+        given_state (list): The initial state of the puzzle.
+        n (int): The size of the puzzle (n x n).
+        verbose (bool): Whether to print the solution.
+        getTime (bool): Whether to measure and print the time taken.
+        heuristic (str): The heuristic to use ('m' for Manhattan, 'd' for disjoint pattern database,
+            'l' for linear conflict, 'w' for walking distance).
+        workers (int): The number of worker processes (the number of CPUs if None).
+        batch_size (int): The number of boards a worker expands between two sends of its children.
+    Returns:
+        tuple: The optimal solution and the number of expanded states, or None if the puzzle has no solution.
+    """
+    start_time = time()
+    workers = workers or multiprocessing.cpu_count()
+    goal = tuple(determine_goal_state(given_state, n))
+    root = tuple(given_state)
+    if heuristic == 'm' and 'a' not in goal:
+        distances = get_manhattan_tables(list(goal), n)[0]
+        root_h = sum(distances[tile][x] for x, tile in enumerate(root) if tile != 0)
+    else:
+        root_h = board_heuristic(list(goal), n, heuristic)(list(root))
+
+    inboxes = [multiprocessing.Queue() for _ in range(workers)]
+    replies = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=hda_worker, daemon=True,
+                                         args=(index, inboxes, replies, root, root_h, goal, n, heuristic, batch_size))
+                 for index in range(workers)]
+    for process in processes:
+        process.start()
+
+    try:
+        # Probe waves until two consecutive ones find only idle workers and the same balanced counters
+        previous = None
+        wave = 0
+        while True:
+            wave += 1
+            for inbox in inboxes:
+                inbox.put(('probe', wave))
+            statuses = [receive(replies, processes) for _ in range(workers)]
+            idle = all(status[3] for status in statuses)
+            totals = (sum(status[4] for status in statuses), sum(status[5] for status in statuses))
+            incumbent = min(status[6] for status in statuses)
+            if idle and totals[0] == totals[1] and totals == previous:
+                break
+            previous = totals if idle and totals[0] == totals[1] else None
+
+        solution = None
+        if incumbent != float('inf'):
+            # Walk back from the goal, undoing the move the owner of every board recorded
+            moves_table = neighbor_table(n)
+            solution = []
+            state = goal
+            while state != root:
+                inboxes[owner(state, workers)].put(('trace', state))
+                direction = receive(replies, processes)[1]
+                solution.append(direction)
+                blank = state.index(0)
+                x = next(x for _, move, x in moves_table[blank] if move == INVERSE_DIRECTIONS[direction])
+                board = list(state)
+                board[blank], board[x] = board[x], 0
+                state = tuple(board)
+            solution.reverse()
+
+        for inbox in inboxes:
+            inbox.put(('stop',))
+        expanded = sum(receive(replies, processes)[2] for _ in range(workers))
+    finally:
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+    if solution is None:
+        print(f"No solution found. Time taken: {time() - start_time} seconds")
+        return None
+    if verbose:
+        print_board_solution(given_state, solution)
+    if getTime:
+        print(f"Time taken: {time() - start_time} seconds")
+    return solution, expanded
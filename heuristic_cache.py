@@ -0,0 +1,112 @@
+# Bounded cache for heuristic values (h only, never g + h), so the same state
+# reached at another depth or in a later search still gets a correct f-value.
+
+from collections import OrderedDict
+
+
+class HeuristicCache:
+    def __init__(self, max_size=1000000, policy='lru'):
+        """
+        Create an empty cache.
+        Args:
+            max_size (int): The maximum number of heuristic values kept.
+            policy (str): The eviction policy, 'lru' (least recently used) or 'clock'
+                (second chance, cheaper bookkeeping on hits).
+        """
+        if policy not in ('lru', 'clock'):
+            raise ValueError("Unknown eviction policy: {}".format(policy))
+
+        self.max_size = max_size
+        self.policy = policy
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.clear()
+
+    def clear(self):
+        """
+        Remove every value (the counters are kept).
+        """
+        if self.policy == 'lru':
+            self.values = OrderedDict()
+        else:
+            self.values = {}  # key -> slot
+            self.keys = [None] * self.max_size
+            self.slot_values = [0] * self.max_size
+            self.referenced = bytearray(self.max_size)
+            self.hand = 0
+
+    def get(self, key):
+        """
+        Get the heuristic value stored for a state.
+        Args:
+            key: The hashable representation of the state.
+        Returns:
+            int: The heuristic value, or None if it's not cached.
+        """
+        if self.policy == 'lru':
+            h = self.values.get(key)
+            if h is None:
+                self.misses += 1
+                return None
+            self.values.move_to_end(key)
+            self.hits += 1
+            return h
+
+        slot = self.values.get(key)
+        if slot is None:
+            self.misses += 1
+            return None
+        self.referenced[slot] = 1
+        self.hits += 1
+        return self.slot_values[slot]
+
+    def put(self, key, h):
+        """
+        Store the heuristic value of a state, evicting another one if the cache is full.
+        Args:
+            key: The hashable representation of the state.
+            h (int): The heuristic value.
+        """
+        if self.policy == 'lru':
+            self.values[key] = h
+            self.values.move_to_end(key)
+            if len(self.values) > self.max_size:
+                self.values.popitem(last=False)
+                self.evictions += 1
+            return
+
+        slot = self.values.get(key)
+        if slot is None:
+            if len(self.values) < self.max_size:
+                slot = len(self.values)
+            else:
+                # Advance the hand, giving referenced entries a second chance
+                while self.referenced[self.hand]:
+                    self.referenced[self.hand] = 0
+                    self.hand = (self.hand + 1) % self.max_size
+                slot = self.hand
+                self.hand = (self.hand + 1) % self.max_size
+                del self.values[self.keys[slot]]
+                self.evictions += 1
+            self.values[key] = slot
+            self.keys[slot] = key
+        self.slot_values[slot] = h
+
+    def stats(self):
+        """
+        Get the counters of the cache.
+        Returns:
+            dict: The hits, misses, evictions, hit rate and current size.
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self.values),
+        }
+
+    def __len__(self):
+        return len(self.values)
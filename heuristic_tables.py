@@ -0,0 +1,201 @@
+# Row and column tables for the linear conflict and walking distance heuristics.
+# The tables are built once per n, saved next to the databases and loaded from
+# disk on later runs. Both heuristics are for the complete goal state only.
+
+from array import array
+from collections import deque
+import os
+import struct
+
+# Global variables to keep the tables of each n in memory once built or loaded
+linear_conflict_tables = {}
+walking_distance_tables = {}
+
+
+def save_table(path, table):
+    """
+    Save a table of small integers to a binary file: count, keys (8 bytes each), values (1 byte each).
+    Args:
+        path (str): The file to write.
+        table (dict): The table, mapping integer keys to values below 256.
+    """
+    keys = array('Q', table.keys())
+    # Write to a temporary file first, so processes loading it at once never read half a table
+    temporary_path = '{}.{}.tmp'.format(path, os.getpid())
+    with open(temporary_path, 'wb') as file:
+        file.write(struct.pack('<Q', len(keys)))
+        keys.tofile(file)
+        file.write(bytes(table.values()))
+    os.replace(temporary_path, path)
+
+
+def load_table(path):
+    """
+    Load a table written by save_table.
+    Args:
+        path (str): The file to read.
+    Returns:
+        dict: The table.
+    """
+    with open(path, 'rb') as file:
+        count = struct.unpack('<Q', file.read(8))[0]
+        keys = array('Q')
+        keys.fromfile(file, count)
+        values = file.read(count)
+    return dict(zip(keys, values))
+
+
+def cached_table(tables, name, n, build, directory='.'):
+    """
+    Get a table from memory, from disk, or by building it (and saving it) for the first time.
+    Args:
+        tables (dict): The in-memory tables of this kind, by n.
+        name (str): The name of the file, without size and extension.
+        n (int): The size of the puzzle (n x n).
+        build (function): The function that builds the table for n.
+        directory (str): The directory holding the table files.
+    Returns:
+        dict: The table.
+    """
+    if n not in tables:
+        path = os.path.join(directory, '{}_{}x{}.tbl'.format(name, n, n))
+        if os.path.exists(path):
+            tables[n] = load_table(path)
+        else:
+            tables[n] = build(n)
+            save_table(path, tables[n])
+    return tables[n]
+
+
+def build_linear_conflict_table(n):
+    """
+    Calculate the extra moves caused by linear conflicts for every possible line.
+    A line is encoded in base n + 1, one digit per cell: 0 if the tile doesn't belong to
+    the line, else its goal position in the line plus one. Every tile that has to leave the
+    line so the others can pass costs two moves; the fewest such tiles is the number of
+    tiles in the line minus the longest increasing subsequence of their goal positions.
+    Args:
+        n (int): The size of the puzzle (n x n).
+    Returns:
+        dict: The extra moves of every line code.
+    """
+    table = {}
+    for code in range((n + 1) ** n):
+        digits = []
+        rest = code
+        for _ in range(n):
+            digits.append(rest % (n + 1))
+            rest //= n + 1
+        digits.reverse()
+        targets = [digit for digit in digits if digit]
+        if len(set(targets)) != len(targets):
+            continue  # Two tiles can't share a goal position
+
+        longest = []
+        for i, target in enumerate(targets):
+            longest.append(1 + max([longest[j] for j in range(i) if targets[j] < target], default=0))
+        table[code] = 2 * (len(targets) - max(longest, default=0))
+    return table
+
+
+def linear_conflict(board, n, directory='.'):
+    """
+    Calculate the linear conflict moves of a board (to be added to its Manhattan distance).
+    Args:
+        board (list): The puzzle state (numbers only).
+        n (int): The size of the puzzle (n x n).
+        directory (str): The directory holding the table files.
+    Returns:
+        int: The extra moves of all rows and columns.
+    """
+    table = cached_table(linear_conflict_tables, 'linear_conflict', n, build_linear_conflict_table, directory)
+    extra = 0
+    for line in range(n):
+        row_code = 0
+        column_code = 0
+        for i in range(n):
+            tile = board[line * n + i]
+            row_code *= n + 1
+            if tile and (tile - 1) // n == line:
+                row_code += (tile - 1) % n + 1
+
+            tile = board[i * n + line]
+            column_code *= n + 1
+            if tile and (tile - 1) % n == line:
+                column_code += (tile - 1) // n + 1
+        extra += table[row_code] + table[column_code]
+    return extra
+
+
+def encode_walking_state(counts, blank_line, n):
+    """
+    Encode a walking distance state in an integer.
+    Args:
+        counts (list): counts[i][j] is the number of tiles in line i whose goal line is j.
+        blank_line (int): The line of the blank.
+        n (int): The size of the puzzle (n x n).
+    Returns:
+        int: The key of the state.
+    """
+    key = blank_line
+    for line in counts:
+        for count in line:
+            key = key * (n + 1) + count
+    return key
+
+
+def build_walking_distance_table(n):
+    """
+    Calculate the walking distance of every row arrangement with a BFS from the goal.
+    Tiles are only told apart by their goal row, and a move takes one tile from a row
+    next to the blank's row into it. The same table serves the columns, because the
+    goal state is symmetric (the blank is in the last row and the last column).
+    Args:
+        n (int): The size of the puzzle (n x n).
+    Returns:
+        dict: The number of moves of every encoded state.
+    """
+    goal = [[n if i == j else 0 for j in range(n)] for i in range(n)]
+    goal[n - 1][n - 1] = n - 1
+    table = {encode_walking_state(goal, n - 1, n): 0}
+    queue = deque([(goal, n - 1)])
+
+    while queue:
+        counts, blank_line = queue.popleft()
+        distance = table[encode_walking_state(counts, blank_line, n)]
+        for line in (blank_line - 1, blank_line + 1):
+            if not 0 <= line < n:
+                continue
+            for target in range(n):
+                if counts[line][target] == 0:
+                    continue
+                child = [row[:] for row in counts]
+                child[line][target] -= 1
+                child[blank_line][target] += 1
+                key = encode_walking_state(child, line, n)
+                if key not in table:
+                    table[key] = distance + 1
+                    queue.append((child, line))
+    return table
+
+
+def walking_distance(board, n, directory='.'):
+    """
+    Calculate the walking distance of a board: the row moves plus the column moves.
+    Args:
+        board (list): The puzzle state (numbers only).
+        n (int): The size of the puzzle (n x n).
+        directory (str): The directory holding the table files.
+    Returns:
+        int: The heuristic value.
+    """
+    table = cached_table(walking_distance_tables, 'walking_distance', n, build_walking_distance_table, directory)
+    rows = [[0] * n for _ in range(n)]
+    columns = [[0] * n for _ in range(n)]
+    for x, tile in enumerate(board):
+        if tile == 0:
+            blank_row, blank_column = divmod(x, n)
+        else:
+            rows[x // n][(tile - 1) // n] += 1
+            columns[x % n][(tile - 1) % n] += 1
+    return table[encode_walking_state(rows, blank_row, n)] + table[encode_walking_state(columns, blank_column, n)]
@@ -0,0 +1,130 @@
+from time import time
+from astar import determine_goal_state, print_board_solution, get_manhattan_tables, neighbor_table
+from conection_database import create_pattern_database_connection
+from heuristic_tables import linear_conflict, walking_distance
+from move_pruning import pruning_machine, PRUNED
+
+FOUND = -1  # Returned by the depth-first search when the goal is reached
+
+
+def board_heuristic(goal, n, heuristic):
+    """
+    Create the function that evaluates a board for the given heuristic option.
+    Args:
+        goal (list): The goal state of the puzzle.
+        n (int): The size of the puzzle (n x n).
+        heuristic (str): The heuristic to use ('m' for Manhattan, 'd' for disjoint pattern database,
+            'l' for linear conflict, 'w' for walking distance).
+    Returns:
+        function: A function that takes a board and returns its heuristic value.
+    """
+    if 'a' in goal:
+        # Patterns have no informative heuristic, search them by depth only
+        return lambda board: 0
+
+    if heuristic == 'd':
+        # Only the additive memory-mapped pattern databases are admissible, else Manhattan is used
+        databases = create_pattern_database_connection(n)
+        if databases is not None:
+            return databases.heuristic
+
+    if heuristic == 'w':
+        return lambda board: walking_distance(board, n)
+
+    distances = get_manhattan_tables(goal, n)[0]
+    if heuristic == 'l':
+        return lambda board: sum(distances[tile][x] for x, tile in enumerate(board) if tile != 0) + \
+            linear_conflict(board, n)
+    return lambda board: sum(distances[tile][x] for x, tile in enumerate(board) if tile != 0)
+
+
+def ida_star_search(given_state, n, verbose=False, getTime=False, heuristic='m', stats=None, pruning='inverse',
+                    pruning_length=8):
+    """
+    Perform IDA* search to solve the sliding puzzle.
+    Runs depth-first searches bounded by f = g + h, raising the bound to the smallest f
+    that exceeded it, on a single board where moves are made and undone in place.
+    Memory is linear in the solution depth. Unsolvable states are never detected.
+    The Manhattan distance is updated per move from the delta table instead of recomputed.
+    Args:
+        given_state (list): The initial state of the puzzle.
+        n (int): The size of the puzzle (n x n).
+        verbose (bool): Whether to print the solution.
+        getTime (bool): Whether to measure and print the time taken.
+        heuristic (str): The heuristic to use ('m' for Manhattan, 'd' for disjoint pattern database,
+            'l' for linear conflict, 'w' for walking distance).
+        stats (SearchStats): Statistics to fill in and hooks to call (on_expand gets the board,
+            which is modified in place as the search goes on); nothing is measured if None.
+        pruning (str): The moves never generated: 'inverse' for the move undoing the previous one,
+            'fsm' for every move completing a duplicate sequence (see move_pruning).
+        pruning_length (int): The length of the longest duplicate sequences pruned with 'fsm'.
+    Returns:
+        tuple: A tuple containing the solution and the number of expanded states.
+    """
+    start_time = time()
+    goal = determine_goal_state(given_state, n)
+    estimate = board_heuristic(goal, n, heuristic)
+    deltas = None
+    if heuristic == 'm' and 'a' not in goal:
+        deltas = get_manhattan_tables(goal, n)[1]
+    # The inverse rule is the automaton of the duplicate sequences of length 2
+    machine = pruning_machine(n, pruning_length if pruning == 'fsm' else 2)
+    moves_table = neighbor_table(n)
+    board = list(given_state)
+    solution = []
+    expanded = 0
+
+    def search(blank, g, h, bound, machine_state):
+        nonlocal expanded
+        f = g + h
+        if f > bound:
+            return f
+        if board == goal:
+            return FOUND
+
+        expanded += 1
+        if stats is not None:
+            stats.expanded(board)
+        minimum = float('inf')
+        transitions = machine[machine_state]
+        for move, direction, x in moves_table[blank]:
+            if transitions[move] == PRUNED:
+                continue  # Undoes the previous move, or completes a longer duplicate sequence
+
+            tile = board[x]
+            board[blank], board[x] = tile, 0
+            if stats is not None:
+                stats.nodes_generated += 1
+            if deltas is not None:
+                child_h = h + deltas[tile][x][direction]
+            else:
+                child_h = estimate(board)
+            solution.append(direction)
+            t = search(x, g + 1, child_h, bound, transitions[move])
+            if t == FOUND:
+                return FOUND
+            solution.pop()
+            board[blank], board[x] = 0, tile
+
+            if t < minimum:
+                minimum = t
+        return minimum
+
+    h = estimate(board)
+    bound = h
+    while True:
+        t = search(board.index(0), 0, h, bound, 0)
+        if t == FOUND:
+            if verbose:
+                print_board_solution(given_state, solution)
+            if getTime:
+                print(f"Time taken: {time() - start_time} seconds")
+            if stats is not None:
+                stats.solved(board, solution)
+            return solution, expanded
+        if t == float('inf'):
+            print(f"No solution found. Time taken: {time() - start_time} seconds")
+            if stats is not None:
+                stats.finished()
+            return None
+        bound = t
@@ -0,0 +1,125 @@
+# Duplicate pruning of move sequences with a finite state machine (Taylor and Korf).
+# Every sequence of blank moves up to a maximum length is simulated on an unbounded
+# board. When a sequence has the same effect as an earlier one in shortlex order (shorter,
+# or as long and lexicographically smaller) that visits no other cells, the sequence is a
+# duplicate: any path containing it can be rewritten into a path as short or shorter, still
+# legal on the board, that does not. The duplicate sequences are compiled into an automaton
+# (Aho-Corasick), so a depth-first search can skip them with one table lookup per move.
+#
+# Moves are the indices of State.DIRECTIONS: 0 '←', 1 '→', 2 '↑', 3 '↓'.
+
+PRUNED = -1  # Transition of a move that completes a duplicate sequence
+
+# Offset of the blank for every move, as (column, row)
+MOVE_OFFSETS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+# Global variable to store the automata built for each n and maximum length
+pruning_machines = {}
+
+
+def duplicate_sequences(n, max_length):
+    """
+    Find the move sequences that duplicate a preferred sequence with the same effect.
+    Only sequences whose blank stays within an n x n window are considered, as no other
+    sequence can be played on the board.
+    Args:
+        n (int): The size of the puzzle (n x n).
+        max_length (int): The length of the longest sequences examined.
+    Returns:
+        list: The duplicate sequences, as tuples of moves. None contains another one.
+    """
+    # Every sequence is (moves, board, visited cells), the board mapping every cell whose
+    # content moved to the cell it came from, the blank being 'blank'
+    preferred = {}  # Effect of every preferred sequence -> the cells each of them visits
+    duplicates = set()
+    layer = [((), {(0, 0): 'blank'}, frozenset([(0, 0)]))]
+    preferred[frozenset([((0, 0), 'blank')])] = [frozenset([(0, 0)])]
+
+    for _ in range(max_length):
+        next_layer = []
+        for moves, board, visited in layer:  # Layers are kept in lexicographic order
+            blank = next(cell for cell, origin in board.items() if origin == 'blank')
+            for move, (dx, dy) in enumerate(MOVE_OFFSETS):
+                target = (blank[0] + dx, blank[1] + dy)
+                child_visited = visited | {target}
+                columns = {cell[0] for cell in child_visited}
+                rows = {cell[1] for cell in child_visited}
+                if max(columns) - min(columns) >= n or max(rows) - min(rows) >= n:
+                    continue  # Doesn't fit on the board
+
+                child_moves = moves + (move,)
+                if any(child_moves[i:] in duplicates for i in range(1, len(child_moves))):
+                    continue  # Contains a shorter duplicate
+
+                child_board = dict(board)
+                child_board[blank] = board.get(target, target)
+                child_board[target] = 'blank'
+                effect = frozenset((cell, origin) for cell, origin in child_board.items() if cell != origin)
+
+                # A sequence visiting a subset of the cells can replace it anywhere it is legal
+                if any(cells <= child_visited for cells in preferred.get(effect, [])):
+                    duplicates.add(child_moves)
+                    continue
+                preferred.setdefault(effect, []).append(child_visited)
+                next_layer.append((child_moves, child_board, child_visited))
+        layer = next_layer
+
+    return sorted(duplicates)
+
+
+def build_pruning_machine(n, max_length=8):
+    """
+    Compile the duplicate sequences into an automaton over the moves.
+    Args:
+        n (int): The size of the puzzle (n x n).
+        max_length (int): The length of the longest duplicate sequences detected.
+    Returns:
+        list: The transitions: for every machine state, the next state after each move,
+        or PRUNED if the move completes a duplicate. The search starts in state 0.
+    """
+    # Trie of the duplicate sequences
+    children = [{}]
+    terminal = [False]
+    for sequence in duplicate_sequences(n, max_length):
+        node = 0
+        for move in sequence:
+            if move not in children[node]:
+                children[node][move] = len(children)
+                children.append({})
+                terminal.append(False)
+            node = children[node][move]
+        terminal[node] = True
+
+    # Breadth-first over the trie: the automaton moves along the longest suffix of the moves
+    # played that is a prefix of a duplicate, and a state is dead once that suffix contains one
+    goto = [[0] * len(MOVE_OFFSETS) for _ in children]
+    failure = [0] * len(children)
+    dead = terminal[:]
+    queue = [0]
+    for node in queue:
+        for move in range(len(MOVE_OFFSETS)):
+            if move in children[node]:
+                child = children[node][move]
+                failure[child] = goto[failure[node]][move] if node else 0
+                dead[child] = dead[child] or dead[failure[child]]
+                goto[node][move] = child
+                queue.append(child)
+            elif node:
+                goto[node][move] = goto[failure[node]][move]
+
+    return [[PRUNED if dead[state] else state for state in row] for row in goto]
+
+
+def pruning_machine(n, max_length=8):
+    """
+    Get the automaton of a puzzle size, building it on first use.
+    Args:
+        n (int): The size of the puzzle (n x n).
+        max_length (int): The length of the longest duplicate sequences detected.
+    Returns:
+        list: The transitions returned by build_pruning_machine.
+    """
+    key = (n, max_length)
+    if key not in pruning_machines:
+        pruning_machines[key] = build_pruning_machine(n, max_length)
+    return pruning_machines[key]
@@ -0,0 +1,192 @@
+# Level-synchronous pattern database generation across processes.
+# The depth of every abstract state (pattern tiles plus blank) lives in one shared-memory
+# byte array. Every BFS layer is split by rank range between the workers, which find the
+# states of the current depth by scanning their range and write depth + 1 into the
+# entries of their children that are still unvisited. All the writes of a layer store the
+# same value, so two workers racing on an entry can't leave a wrong depth (first write wins,
+# the second one is a no-op), and the end of every layer is a barrier.
+#
+# For additive databases moving the blank over a non-pattern cell is free: each layer first
+# extends the depth of every state to the other blank positions it can reach for free (all
+# in the same block of ranks, as the blank is ranked last), then expands the tile moves.
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import os
+from time import time
+from astar import neighbor_table
+from pattern_database import (UNVISITED, pattern_tiles, number_of_entries, rank_positions, unrank_positions,
+                              pattern_positions)
+
+# Shared state of a worker process, set by attach_worker
+worker = {}
+
+
+def attach_worker(name, n, k, additive):
+    """
+    Open the shared depth array in a worker process.
+    Args:
+        name (str): The name of the shared memory block.
+        n (int): The size of the puzzle (n x n).
+        k (int): The number of pattern tiles.
+        additive (bool): Whether only the moves of the pattern tiles cost one.
+    """
+    worker['memory'] = shared_memory.SharedMemory(name=name)
+    worker['size'] = n * n
+    worker['k'] = k
+    worker['additive'] = additive
+    worker['neighbors'] = neighbor_table(n)
+
+
+def ranks_at_depth(start, stop, depth):
+    """
+    Find the states of a rank range whose depth is the given one.
+    Args:
+        start (int): The first rank.
+        stop (int): The rank after the last one.
+        depth (int): The depth looked for.
+    Yields:
+        int: The ranks, in ascending order.
+    """
+    data = bytes(worker['memory'].buf[start:stop])
+    target = bytes([depth])
+    i = data.find(target)
+    while i != -1:
+        yield start + i
+        i = data.find(target, i + 1)
+
+
+def close_free_moves(start, stop, depth):
+    """
+    Give the depth of the states of a range to the states their blank reaches for free
+    (additive databases only). The range must hold whole blocks of blank positions.
+    Args:
+        start (int): The first rank.
+        stop (int): The rank after the last one.
+        depth (int): The depth of the layer.
+    Returns:
+        int: The number of states reached.
+    """
+    depths = worker['memory'].buf
+    size, k, neighbors = worker['size'], worker['k'], worker['neighbors']
+    reached = 0
+    for rank in ranks_at_depth(start, stop, depth):
+        stack = [unrank_positions(rank, size, k + 1)]
+        while stack:
+            positions = stack.pop()
+            blank = positions[-1]
+            for _, _, cell in neighbors[blank]:
+                if cell not in positions:
+                    child = positions[:]
+                    child[-1] = cell
+                    child_rank = rank_positions(child, size)
+                    if depths[child_rank] == UNVISITED:
+                        depths[child_rank] = depth
+                        reached += 1
+                        stack.append(child)
+    return reached
+
+
+def expand_layer(start, stop, depth):
+    """
+    Expand the states of a range at a depth, writing depth + 1 into their unvisited children.
+    Args:
+        start (int): The first rank.
+        stop (int): The rank after the last one.
+        depth (int): The depth of the layer.
+    Returns:
+        int: The number of states of the range at this depth.
+    """
+    depths = worker['memory'].buf
+    size, k, neighbors, additive = worker['size'], worker['k'], worker['neighbors'], worker['additive']
+    count = 0
+    for rank in ranks_at_depth(start, stop, depth):
+        count += 1
+        positions = unrank_positions(rank, size, k + 1)
+        blank = positions[-1]
+        for _, _, cell in neighbors[blank]:
+            child = positions[:]
+            if cell in positions:
+                child[positions.index(cell)] = blank  # A pattern tile slides into the blank
+            elif additive:
+                continue  # Free move, already followed by close_free_moves
+            child[-1] = cell
+            child_rank = rank_positions(child, size)
+            if depths[child_rank] == UNVISITED:
+                depths[child_rank] = depth + 1
+    return count
+
+
+def minimum_over_blank(start, stop, blank_radix):
+    """
+    Get the cost of every placement of the tiles of a range: the lowest depth of its blank positions.
+    Args:
+        start (int): The first rank of the placements.
+        stop (int): The rank after the last placement.
+        blank_radix (int): The number of blank positions of every placement.
+    Returns:
+        bytes: The cost of every placement.
+    """
+    depths = worker['memory'].buf
+    return bytes(min(depths[i * blank_radix:(i + 1) * blank_radix]) for i in range(start, stop))
+
+
+def build_pattern_database_parallel(goal_pattern, n, additive=False, workers=None, chunk_size=1 << 20,
+                                    verbose=False):
+    """
+    Fill a pattern database with a level-synchronous BFS split across processes.
+    Gives the same table as build_pattern_database.
+    Args:
+        goal_pattern (list): The goal pattern, as returned by determine_goal_state.
+        n (int): The size of the puzzle (n x n).
+        additive (bool): Whether to count only the moves of the pattern tiles.
+        workers (int): The number of processes (the number of CPUs if None).
+        chunk_size (int): The approximate number of ranks scanned per task.
+        verbose (bool): Whether to print the progress of every BFS layer.
+    Returns:
+        bytearray: The table, indexed like the one of build_pattern_database.
+    """
+    start_time = time()
+    size = n * n
+    tiles = pattern_tiles(goal_pattern)
+    k = len(tiles)
+    entries = number_of_entries(size, k + 1)
+    blank_radix = size - k
+    workers = workers or os.cpu_count()
+
+    # Ranges of whole blocks of blank positions, so the free moves stay inside one task
+    chunk_size = max(blank_radix, chunk_size - chunk_size % blank_radix)
+    ranges = [(start, min(start + chunk_size, entries)) for start in range(0, entries, chunk_size)]
+
+    memory = shared_memory.SharedMemory(create=True, size=entries)
+    depths = memory.buf
+    try:
+        for start, stop in ranges:
+            depths[start:stop] = bytes([UNVISITED]) * (stop - start)
+        depths[rank_positions(pattern_positions(goal_pattern, tiles), size)] = 0
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=attach_worker,
+                                 initargs=(memory.name, n, k, additive)) as executor:
+            depth = 0
+            while True:
+                if additive:
+                    list(executor.map(close_free_moves, *zip(*ranges), [depth] * len(ranges)))
+                count = sum(executor.map(expand_layer, *zip(*ranges), [depth] * len(ranges)))
+                if count == 0:
+                    break
+                if verbose:
+                    print("Depth {}: {} states in {:.2f} seconds.".format(depth, count, time() - start_time))
+                depth += 1
+
+            if not additive:
+                return bytearray(depths[:entries])
+
+            placements = entries // blank_radix
+            step = max(1, chunk_size // blank_radix)
+            blocks = [(start, min(start + step, placements)) for start in range(0, placements, step)]
+            return bytearray(b''.join(executor.map(minimum_over_blank, *zip(*blocks),
+                                                   [blank_radix] * len(blocks))))
+    finally:
+        del depths
+        memory.close()
+        memory.unlink()
@@ -0,0 +1,478 @@
+# Pattern databases built by a retrograde breadth-first search.
+# Instead of solving every sub-pattern of every state with A*, a single backward
+# BFS from the goal pattern fills the cost of every abstract pattern state at once.
+
+from array import array
+from time import time
+import mmap
+import os
+import struct
+
+UNVISITED = 255  # Marker for entries not reached yet (costs always fit in one byte)
+
+# Binary file layout: magic, n, number of tiles, flags, the tiles, then one byte
+# (or one nibble) per entry, indexed by rank_positions.
+MAGIC = b'PDB1'
+HEADER = struct.Struct('<4sBBB')
+FLAG_BLANK = 1  # Entries are indexed by the tiles and the blank position
+FLAG_NIBBLE = 2  # Two entries are packed in every byte, low nibble first
+
+MODULE_DIRECTORY = os.path.dirname(os.path.abspath(__file__))  # Where the tables built on first use are kept
+
+
+def pattern_tiles(goal_pattern):
+    """
+    Get the tiles that belong to a pattern, in ascending order.
+    Args:
+        goal_pattern (list): The goal pattern (e.g. [1, 2, 3, 4, 'a', 'a', 'a', 'a', 0]).
+    Returns:
+        list: The numbered tiles of the pattern, without the blank.
+    """
+    return sorted(tile for tile in goal_pattern if tile != 'a' and tile != 0)
+
+
+def number_of_entries(size, k):
+    """
+    Calculate the number of ways to place k distinct items on a board.
+    Args:
+        size (int): The number of cells of the board (n * n).
+        k (int): The number of items placed.
+    Returns:
+        int: size * (size - 1) * ... * (size - k + 1)
+    """
+    entries = 1
+    for i in range(k):
+        entries *= size - i
+    return entries
+
+
+def rank_positions(positions, size):
+    """
+    Rank a sequence of distinct board positions (a partial permutation).
+    Each position is replaced by its index among the cells still free, giving a
+    mixed radix number in the range [0, number_of_entries(size, len(positions))).
+    Args:
+        positions (list): The positions of the pattern items.
+        size (int): The number of cells of the board (n * n).
+    Returns:
+        int: The rank of the positions.
+    """
+    rank = 0
+    used = 0  # Bitmask of the cells already taken
+    remaining = size
+    for position in positions:
+        rank = rank * remaining + position - (used & ((1 << position) - 1)).bit_count()
+        used |= 1 << position
+        remaining -= 1
+    return rank
+
+
+def unrank_positions(rank, size, k):
+    """
+    Inverse of rank_positions.
+    Args:
+        rank (int): The rank of the positions.
+        size (int): The number of cells of the board (n * n).
+        k (int): The number of positions encoded in the rank.
+    Returns:
+        list: The positions of the pattern items.
+    """
+    digits = [0] * k
+    for i in range(k - 1, -1, -1):
+        radix = size - i
+        digits[i] = rank % radix
+        rank //= radix
+
+    free = list(range(size))
+    return [free.pop(digit) for digit in digits]
+
+
+def pattern_positions(state, tiles):
+    """
+    Get the positions of the pattern tiles and the blank in a state.
+    Args:
+        state (list): A complete puzzle state or a pattern with 'a' placeholders.
+        tiles (list): The tiles of the pattern.
+    Returns:
+        list: The position of each tile followed by the position of the blank.
+    """
+    positions = [state.index(tile) for tile in tiles]
+    positions.append(state.index(0))
+    return positions
+
+
+def build_pattern_database(goal_pattern, n, additive=False, verbose=False):
+    """
+    Fill a pattern database with a backward breadth-first search from the goal pattern.
+    By default every move of the blank costs one, so the entries are the same number
+    of moves a_star_search returns for the pattern. With additive=True only the moves
+    of pattern tiles are counted, so the costs of disjoint patterns can be added and
+    the sum stays admissible.
+    Args:
+        goal_pattern (list): The goal pattern, as returned by determine_goal_state.
+        n (int): The size of the puzzle (n x n).
+        additive (bool): Whether to count only the moves of the pattern tiles.
+        verbose (bool): Whether to print the progress of every BFS layer.
+    Returns:
+        bytearray: The cost of every pattern state, indexed by the rank of the
+        positions of the pattern tiles followed by the blank (only the tiles if additive).
+    """
+    if additive:
+        return build_additive_pattern_database(goal_pattern, n, verbose)
+
+    from astar import neighbor_table  # Imported on use, as astar imports this module
+    start_time = time()
+    size = n * n
+    tiles = pattern_tiles(goal_pattern)
+    k = len(tiles) + 1
+    neighbors = neighbor_table(n)
+
+    costs = bytearray([UNVISITED]) * number_of_entries(size, k)
+    root = rank_positions(pattern_positions(goal_pattern, tiles), size)
+    costs[root] = 0
+    frontier = array('Q', [root])
+    depth = 0
+
+    while frontier:
+        next_frontier = array('Q')
+        for rank in frontier:
+            positions = unrank_positions(rank, size, k)
+            blank = positions[-1]
+            for _, _, cell in neighbors[blank]:
+                child = positions[:]
+                if cell in positions:
+                    child[positions.index(cell)] = blank  # A pattern tile slides into the blank
+                child[-1] = cell
+                child_rank = rank_positions(child, size)
+                if costs[child_rank] == UNVISITED:
+                    costs[child_rank] = depth + 1
+                    next_frontier.append(child_rank)
+        depth += 1
+        frontier = next_frontier
+        if verbose:
+            print("Depth {}: {} states in {:.2f} seconds.".format(depth, len(frontier), time() - start_time))
+
+    return costs
+
+
+def build_additive_pattern_database(goal_pattern, n, verbose=False):
+    """
+    Fill an additive pattern database with a backward 0-1 breadth-first search.
+    Moving the blank over a non-pattern cell is free and stays in the current layer,
+    moving a pattern tile costs one and goes to the next layer. Since the blank is the
+    last position ranked, rank // (size - k) is the rank of the tiles alone, and the
+    first time a placement of the tiles is reached is its minimum cost.
+    Args:
+        goal_pattern (list): The goal pattern, as returned by determine_goal_state.
+        n (int): The size of the puzzle (n x n).
+        verbose (bool): Whether to print the progress of every BFS layer.
+    Returns:
+        bytearray: The cost of every placement of the pattern tiles, indexed by the
+        rank of their positions.
+    """
+    from astar import neighbor_table  # Imported on use, as astar imports this module
+    start_time = time()
+    size = n * n
+    tiles = pattern_tiles(goal_pattern)
+    k = len(tiles)
+    blank_radix = size - k
+    neighbors = neighbor_table(n)
+
+    costs = bytearray([UNVISITED]) * number_of_entries(size, k)
+    seen = bytearray(number_of_entries(size, k + 1))
+    root = rank_positions(pattern_positions(goal_pattern, tiles), size)
+    frontier = array('Q', [root])
+    depth = 0
+
+    while frontier:
+        next_frontier = array('Q')
+        queued = len(frontier)  # States reached by a tile move may have been closed since
+        i = 0
+        while i < len(frontier):
+            rank = frontier[i]
+            if i < queued:
+                if seen[rank]:
+                    i += 1
+                    continue
+                seen[rank] = 1
+            i += 1
+
+            if costs[rank // blank_radix] == UNVISITED:
+                costs[rank // blank_radix] = depth
+
+            positions = unrank_positions(rank, size, k + 1)
+            blank = positions[-1]
+            for _, _, cell in neighbors[blank]:
+                child = positions[:]
+                child[-1] = cell
+                if cell in positions:
+                    child[positions.index(cell)] = blank
+                    child_rank = rank_positions(child, size)
+                    if not seen[child_rank]:
+                        next_frontier.append(child_rank)
+                else:
+                    child_rank = rank_positions(child, size)
+                    if not seen[child_rank]:
+                        seen[child_rank] = 1
+                        frontier.append(child_rank)
+
+        if verbose:
+            print("Depth {}: {} states in {:.2f} seconds.".format(depth, len(frontier), time() - start_time))
+        depth += 1
+        frontier = next_frontier
+
+    return costs
+
+
+def lookup_cost(costs, state, tiles, size):
+    """
+    Look up the cost of the pattern contained in a state.
+    Args:
+        costs (bytearray): A table returned by build_pattern_database.
+        state (list): A complete puzzle state or a pattern with 'a' placeholders.
+        tiles (list): The tiles of the pattern.
+        size (int): The number of cells of the board (n * n).
+    Returns:
+        int: The number of moves needed to solve the pattern.
+    """
+    return costs[rank_positions(pattern_positions(state, tiles), size)]
+
+
+def pattern_database_path(n, index, directory='.'):
+    """
+    Get the conventional file name of a binary pattern database.
+    Args:
+        n (int): The size of the puzzle (n x n).
+        index (int): The number of the pattern (1 for the first pattern of create_patterns).
+        directory (str): The directory holding the databases.
+    Returns:
+        str: The path of the file.
+    """
+    return os.path.join(directory, 'pattern_database_{}x{}_{}.pdb'.format(n, n, index))
+
+
+def distance_table_path(n, directory='.'):
+    """
+    Get the file name of the exact distance table of a puzzle size.
+    Args:
+        n (int): The size of the puzzle (n x n).
+        directory (str): The directory holding the table.
+    Returns:
+        str: The path of the file.
+    """
+    return os.path.join(directory, 'distance_table_{}x{}.pdb'.format(n, n))
+
+
+def goal_pattern_database_path(goal_pattern, n, directory='.'):
+    """
+    Get the file name of the pattern database of a goal pattern indexed by its tiles and the blank.
+    Args:
+        goal_pattern (list): The goal pattern.
+        n (int): The size of the puzzle (n x n).
+        directory (str): The directory holding the database.
+    Returns:
+        str: The path of the file.
+    """
+    tiles = '-'.join(str(tile) for tile in pattern_tiles(goal_pattern))
+    return os.path.join(directory, 'pattern_database_{}x{}_blank_{}.pdb'.format(n, n, tiles))
+
+
+def encode_pattern_database(costs, goal_pattern, n, with_blank=True):
+    """
+    Encode a pattern database in the compact binary format.
+    Tables whose costs all fit in four bits are stored with one nibble per entry.
+    Args:
+        costs (bytearray): The table returned by build_pattern_database.
+        goal_pattern (list): The goal pattern the table was built from.
+        n (int): The size of the puzzle (n x n).
+        with_blank (bool): Whether the table is indexed by the blank position too.
+    Returns:
+        bytes: The contents of the file.
+    """
+    tiles = pattern_tiles(goal_pattern)
+    flags = FLAG_BLANK if with_blank else 0
+    data = costs
+
+    if max(costs) < 16:
+        flags |= FLAG_NIBBLE
+        data = bytearray((len(costs) + 1) // 2)
+        data[:len(costs[0::2])] = costs[0::2]
+        for i, cost in enumerate(costs[1::2]):
+            data[i] |= cost << 4
+
+    return HEADER.pack(MAGIC, n, len(tiles), flags) + bytes(tiles) + bytes(data)
+
+
+def write_pattern_database(path, costs, goal_pattern, n, with_blank=True):
+    """
+    Write a pattern database to a compact binary file (see encode_pattern_database).
+    Args:
+        path (str): The file to write.
+        costs (bytearray): The table returned by build_pattern_database.
+        goal_pattern (list): The goal pattern the table was built from.
+        n (int): The size of the puzzle (n x n).
+        with_blank (bool): Whether the table is indexed by the blank position too.
+    """
+    with open(path, 'wb') as file:
+        file.write(encode_pattern_database(costs, goal_pattern, n, with_blank))
+
+
+class PatternDatabase:
+    def __init__(self, path, contents=None):
+        """
+        Open a binary pattern database with mmap, so only the pages that are read
+        get loaded and every process reading the file shares the OS page cache.
+        Args:
+            path (str): The file written by write_pattern_database.
+            contents (bytes): The encoded table, kept in anonymous memory instead of reading
+                the file (for tables that couldn't be written).
+        """
+        if contents is None:
+            with open(path, 'rb') as file:
+                self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.data = mmap.mmap(-1, len(contents))
+            self.data.write(contents)
+
+        magic, self.n, k, flags = HEADER.unpack_from(self.data)
+        if magic != MAGIC:
+            raise ValueError("{} is not a pattern database file".format(path))
+
+        self.path = path
+        self.size = self.n * self.n
+        self.tiles = list(self.data[HEADER.size:HEADER.size + k])
+        self.with_blank = bool(flags & FLAG_BLANK)
+        self.nibble = bool(flags & FLAG_NIBBLE)
+        self.offset = HEADER.size + k
+
+    def cost(self, rank):
+        """
+        Read the entry stored at a rank.
+        Args:
+            rank (int): The rank of the pattern positions.
+        Returns:
+            int: The stored cost.
+        """
+        if self.nibble:
+            byte = self.data[self.offset + (rank >> 1)]
+            return byte >> 4 if rank & 1 else byte & 15
+        return self.data[self.offset + rank]
+
+    def lookup(self, state):
+        """
+        Look up the cost of the pattern contained in a state.
+        Args:
+            state (list): A complete puzzle state or a pattern with 'a' placeholders.
+        Returns:
+            int: The stored cost.
+        """
+        positions = [state.index(tile) for tile in self.tiles]
+        if self.with_blank:
+            positions.append(state.index(0))
+        return self.cost(rank_positions(positions, self.size))
+
+    def close(self):
+        self.data.close()
+
+
+class DisjointPatternDatabase:
+    def __init__(self, databases):
+        """
+        Group the pattern databases of a partition of the tiles.
+        Args:
+            databases (list): The PatternDatabase of every pattern.
+        Raises:
+            ValueError: If a database is indexed by the blank, as its costs can't be added.
+        """
+        for database in databases:
+            if database.with_blank:
+                raise ValueError("{} counts the moves of every tile, so it can't be added to the others; "
+                                 "build the databases with additive=True".format(database.path))
+        self.databases = databases
+
+    def heuristic(self, state):
+        """
+        Calculate the heuristic value of a state as the sum of the pattern costs.
+        Args:
+            state (list): The puzzle state.
+        Returns:
+            int: The heuristic value.
+        """
+        return sum(database.lookup(state) for database in self.databases)
+
+    def close(self):
+        for database in self.databases:
+            database.close()
+
+
+def open_pattern_databases(n, directory='.'):
+    """
+    Open every binary pattern database written for a puzzle size.
+    Args:
+        n (int): The size of the puzzle (n x n).
+        directory (str): The directory holding the databases.
+    Returns:
+        DisjointPatternDatabase: The databases, or None if they were not generated yet.
+    Raises:
+        ValueError: If a database is indexed by the blank (written with additive=False).
+    """
+    databases = []
+    index = 1
+    while os.path.exists(pattern_database_path(n, index, directory)):
+        databases.append(PatternDatabase(pattern_database_path(n, index, directory)))
+        index += 1
+
+    if not databases:
+        return None
+    try:
+        return DisjointPatternDatabase(databases)
+    except ValueError:
+        for database in databases:
+            database.close()
+        raise
+
+
+def open_distance_table(n, directory=MODULE_DIRECTORY, verbose=False):
+    """
+    Open the exact goal distance of every state: a pattern database whose pattern is the
+    whole board, built by BFS from the complete goal and written on first use.
+    Only practical for 3x3 (181,440 reachable states in a 362,880 byte table).
+    Args:
+        n (int): The size of the puzzle (n x n).
+        directory (str): The directory holding the table (next to this module by default,
+            whatever the working directory).
+        verbose (bool): Whether to print the progress of the BFS when it has to be built.
+    Returns:
+        PatternDatabase: The table, indexed by the rank of the positions of every tile and
+        the blank; unreachable states hold UNVISITED.
+    """
+    return open_or_build_pattern_database(distance_table_path(n, directory), list(range(1, n * n)) + [0], n,
+                                          verbose=verbose)
+
+
+def open_or_build_pattern_database(path, goal_pattern, n, verbose=False):
+    """
+    Open a pattern database indexed by the tiles and the blank, building it by BFS and
+    writing it to the file first if it doesn't exist yet. If the file can't be written
+    the table is kept in memory, and built again by the next process.
+    Args:
+        path (str): The file of the database.
+        goal_pattern (list): The goal pattern.
+        n (int): The size of the puzzle (n x n).
+        verbose (bool): Whether to print the progress of the BFS when it has to be built.
+    Returns:
+        PatternDatabase: The database.
+    """
+    if not os.path.exists(path):
+        contents = encode_pattern_database(build_pattern_database(goal_pattern, n, verbose=verbose), goal_pattern, n)
+        # Write to a temporary file first, so processes building it at once never read half a table
+        temporary_path = '{}.{}.tmp'.format(path, os.getpid())
+        try:
+            with open(temporary_path, 'wb') as file:
+                file.write(contents)
+            os.replace(temporary_path, path)
+        except OSError:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            return PatternDatabase(path, contents)
+    return PatternDatabase(path)
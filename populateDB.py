@@ -19,7 +19,7 @@ def list_to_text_state(state_list):
         print("Error converting list to text state:", str(e))
         return None
 
-def visit_unvisited_states(x=100,n=3):
+def visit_unvisited_states(x=10000,n=3):
     db_name = ''
     if n == 3:
         db_name = 'puzzle_database_3x3.db'
@@ -41,6 +41,13 @@ def visit_unvisited_states(x=100,n=3):
 
     start_time = time.time()  # Record the start time
     count = 0
+    updates = []
+
+    # Mark the state as visited and populate the sub states and costs in a single statement
+    pattern_count = 2 if n == 3 else 3
+    update_query = 'UPDATE puzzles SET visited = 1, {}, {}, cost_total = ? WHERE state = ?'.format(
+        ', '.join('sub_state_{} = ?'.format(i + 1) for i in range(pattern_count)),
+        ', '.join('cost_{} = ?'.format(i + 1) for i in range(pattern_count)))
 
     for state_tuple in unvisited_states:
         count += 1
@@ -50,29 +57,23 @@ def visit_unvisited_states(x=100,n=3):
         # Call the number_of_moves function to get the updates
         response = number_of_moves(state_list,n)
         
-        sub_state_1 = list_to_text_state(response[0])
-        sub_state_2 = list_to_text_state(response[1])
-        cost_1 = response[2]
-        cost_2 = response[3]
-        cost_total = response[4]
-        
-        # Update the visited state to 1
-        cursor.execute('UPDATE puzzles SET visited = 1 WHERE state = ?', (state,))
-        
-        # Populate new values
-        cursor.execute('UPDATE puzzles SET sub_state_1 = ? WHERE state = ?', (sub_state_1, state))
-        cursor.execute('UPDATE puzzles SET sub_state_2 = ? WHERE state = ?', (sub_state_2, state))
-        cursor.execute('UPDATE puzzles SET cost_1 = ? WHERE state = ?', (cost_1, state))
-        cursor.execute('UPDATE puzzles SET cost_2 = ? WHERE state = ?', (cost_2, state))
-        cursor.execute('UPDATE puzzles SET cost_total = ? WHERE state = ?', (cost_total, state))
+        sub_states = [list_to_text_state(pattern) for pattern in response[:pattern_count]]
+        costs = response[pattern_count:]
+
+        # Queue the update; the pattern databases make each row a few lookups
+        updates.append((*sub_states, *costs, state))
 
         if count % x == 0:
+            cursor.executemany(update_query, updates)
+            conn.commit()
+            updates = []
             # Print the elapsed time after every 'x' states have been visited
             end_time = time.time()
             elapsed_time = end_time - start_time
             print("Visited {} states in {:.2f} seconds.".format(count, elapsed_time))
 
-        conn.commit()
+    cursor.executemany(update_query, updates)
+    conn.commit()
 
     end_time = time.time()  # Record the end time
     elapsed_time = end_time - start_time  # Calculate the final elapsed time
@@ -1,24 +1,23 @@
-# This is a faster implementation of populateDB.py using multithreading.
-# It only supports 3x3 puzzles for now.
+# This is a faster implementation of populateDB.py using multiple processes.
+# A process pool computes the entries (the A* work is not serialized by the GIL), and a
+# single writer process takes them from a queue and writes them with executemany in large
+# WAL-mode transactions. Only rows with visited = 0 are read, so an interrupted run
+# can be resumed. Supports 3x3 and 4x4 databases.
+# The pattern databases are built once, before the pool starts, and every worker maps
+# the files with mmap, so the processes share one copy in the OS page cache.
 
 import sqlite3
 import time
-from astar import number_of_moves
-from concurrent.futures import ThreadPoolExecutor
+from astar import number_of_moves, create_patterns, get_pattern_database
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 import os
 import multiprocessing  # Import the multiprocessing module
 
-# Global variable to signal the threads to stop
-stop_threads = False
-
 # Global variable to record the start time
 start_time = None
 
 def get_available_threads():
-    # Get the number of CPU cores
-    num_cores = os.cpu_count()
-
-    # Get the number of available threads
+    # Get the number of available processors
     num_threads = multiprocessing.cpu_count()
 
     return num_threads
@@ -39,77 +38,145 @@ def list_to_text_state(state_list):
         print("Error converting list to text state:", str(e))
         return None
 
-def process_state(state_tuple):
-    conn = sqlite3.connect('puzzle_database_3x3.db', check_same_thread=False)
-    cursor = conn.cursor()
-
-    state = state_tuple[0]
-    state_list = text_state_to_list(state)
-
-    response = number_of_moves(state_list,n=3)
-
-    sub_state_1 = list_to_text_state(response[0])
-    sub_state_2 = list_to_text_state(response[1])
-    cost_1 = response[2]
-    cost_2 = response[3]
-    cost_total = response[4]
-
-    # Update the visited state to 1
-    cursor.execute('UPDATE puzzles SET visited = 1 WHERE state = ?', (state,))
+def get_pattern_count(n):
+    return 2 if n == 3 else 3
+
+def get_update_query(n):
+    # Mark the state as visited and populate the sub states and costs in a single statement
+    pattern_count = get_pattern_count(n)
+    return 'UPDATE puzzles SET visited = 1, {}, {}, cost_total = ? WHERE state = ?'.format(
+        ', '.join('sub_state_{} = ?'.format(i + 1) for i in range(pattern_count)),
+        ', '.join('cost_{} = ?'.format(i + 1) for i in range(pattern_count)))
+
+def read_unvisited_chunks(db_name, chunk_size):
+    """
+    Stream the unvisited states in chunks, one short read per chunk (keyset pagination by rowid).
+    Args:
+        db_name (str): The database file.
+        chunk_size (int): The number of states per chunk.
+    Yields:
+        list: The text states of the chunk.
+    """
+    conn = sqlite3.connect(db_name)
+    last_rowid = 0
+    while True:
+        rows = conn.execute('SELECT rowid, state FROM puzzles WHERE visited = 0 AND rowid > ? ORDER BY rowid LIMIT ?',
+                            (last_rowid, chunk_size)).fetchall()
+        if not rows:
+            break
+        last_rowid = rows[-1][0]
+        yield [row[1] for row in rows]
+    conn.close()
 
-    # Populate new values
-    cursor.execute('UPDATE puzzles SET sub_state_1 = ? WHERE state = ?', (sub_state_1, state))
-    cursor.execute('UPDATE puzzles SET sub_state_2 = ? WHERE state = ?', (sub_state_2, state))
-    cursor.execute('UPDATE puzzles SET cost_1 = ? WHERE state = ?', (cost_1, state))
-    cursor.execute('UPDATE puzzles SET cost_2 = ? WHERE state = ?', (cost_2, state))
-    cursor.execute('UPDATE puzzles SET cost_total = ? WHERE state = ?', (cost_total, state))
+def attach_worker(n):
+    """
+    Open the pattern databases of a puzzle size in a process, building the missing files.
+    Args:
+        n (int): The size of the puzzle (n x n).
+    """
+    for pattern in create_patterns(list(range(1, n * n)) + [0], n):
+        get_pattern_database(pattern, n)
+
+def compute_entries(states, n):
+    """
+    Compute the database entries of a chunk of states (runs in the process pool).
+    Args:
+        states (list): The text states.
+        n (int): The size of the puzzle (n x n).
+    Returns:
+        list: The parameters of the update query for every state.
+    """
+    pattern_count = get_pattern_count(n)
+    entries = []
+    for state in states:
+        response = number_of_moves(text_state_to_list(state), n)
+        sub_states = [list_to_text_state(pattern) for pattern in response[:pattern_count]]
+        entries.append((*sub_states, *response[pattern_count:], state))
+    return entries
+
+def write_entries(db_name, n, queue, batch_size):
+    """
+    Single writer: take chunks of entries from the queue until None arrives and write them
+    with executemany, one transaction per batch_size rows.
+    Args:
+        db_name (str): The database file.
+        n (int): The size of the puzzle (n x n).
+        queue (multiprocessing.Queue): The chunks of entries computed by the pool.
+        batch_size (int): The number of rows written per transaction.
+    """
+    conn = sqlite3.connect(db_name)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    update_query = get_update_query(n)
+
+    writer_start = time.time()
+    count = 0
+    batch = []
+    while True:
+        entries = queue.get()
+        if entries is not None:
+            batch.extend(entries)
+        if batch and (entries is None or len(batch) >= batch_size):
+            with conn:
+                conn.executemany(update_query, batch)
+            count += len(batch)
+            batch = []
+            elapsed_time = time.time() - writer_start
+            print("Visited {} states in {:.2f} seconds ({:.0f} states/s).".format(count, elapsed_time, count / elapsed_time))
+        if entries is None:
+            break
 
-    conn.commit()
     conn.close()
 
-    return state
-
-def visit_unvisited_states(num_threads=get_available_threads()):
-    global stop_threads
+def visit_unvisited_states(n=3, num_workers=get_available_threads(), chunk_size=1000, batch_size=50000):
     global start_time  # Use the global start_time variable
 
+    db_name = 'puzzle_database_{}x{}.db'.format(n, n)
+    if not os.path.exists(db_name):
+        print(f"The database was not created yet. Run createSolvableDB{n}x{n}.py first.")
+        return
+
     start_time = time.time()  # Record the start time
-    print("Using {} threads.".format(num_threads))
-    conn = sqlite3.connect('puzzle_database_3x3.db', check_same_thread=False)
-    cursor = conn.cursor()
+    attach_worker(n)  # Build the pattern database files before the workers open them
+    print("Pattern databases ready in {:.2f} seconds.".format(time.time() - start_time))
+    print("Using {} processes.".format(num_workers))
 
-    # Select all entries where visited is 0 and cost_total is null
-    cursor.execute('SELECT state FROM puzzles WHERE visited = 0 AND cost_total IS NULL')
-    unvisited_states = cursor.fetchall()
+    # Bounded queue and bounded number of chunks in flight, so memory stays constant
+    queue = multiprocessing.Queue(maxsize=num_workers * 4)
+    writer = multiprocessing.Process(target=write_entries, args=(db_name, n, queue, batch_size))
+    writer.start()
 
     count = 0
-
-    with ThreadPoolExecutor(max_workers=num_threads) as executor:
-        for state_tuple in unvisited_states:
-            if stop_threads:
-                break  # Exit the loop if the stop flag is set
-
-            executor.submit(process_state, state_tuple)
-            count += 1
-
-    # Wait for all threads to finish before closing the connection
-    executor.shutdown()
+    try:
+        with ProcessPoolExecutor(max_workers=num_workers, initializer=attach_worker, initargs=(n,)) as executor:
+            pending = set()
+            for states in read_unvisited_chunks(db_name, chunk_size):
+                if len(pending) >= num_workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        queue.put(future.result())
+                pending.add(executor.submit(compute_entries, states, n))
+                count += len(states)
+
+            for future in pending:
+                queue.put(future.result())
+    finally:
+        queue.put(None)  # Let the writer flush what it has and stop
+        writer.join()
 
     end_time = time.time()  # Record the end time
     elapsed_time = end_time - start_time  # Calculate the final elapsed time
 
-    conn.commit()
-    conn.close()
-
     print("Visited {} states.".format(count))
     print("Visited the whole database in {:.2f} seconds.".format(elapsed_time))
 
 # Call the function to visit unvisited states and measure the time
-try:
-    visit_unvisited_states()
-except KeyboardInterrupt:
-    stop_threads = True
-    end_time = time.time()  # Record the end time on keyboard interrupt
-    elapsed_time = end_time - start_time  # Calculate elapsed time
-    print("Program terminated by user.")
-    print("Elapsed time: {:.2f} seconds".format(elapsed_time))
\ No newline at end of file
+if __name__ == "__main__":
+    n_size = int(input("Enter the n-size of the board: "))
+    try:
+        visit_unvisited_states(n=n_size)
+    except KeyboardInterrupt:
+        end_time = time.time()  # Record the end time on keyboard interrupt
+        elapsed_time = end_time - start_time  # Calculate elapsed time
+        print("Program terminated by user. Run it again to resume from the unvisited states.")
+        print("Elapsed time: {:.2f} seconds".format(elapsed_time))
@@ -0,0 +1,88 @@
+# Per-search statistics and instrumentation hooks.
+# Pass a SearchStats to a search to have it filled in; searches run without one
+# skip all the counting, timing and callbacks.
+
+from time import perf_counter
+
+
+class SearchStats:
+    def __init__(self, on_expand=None, on_solution=None, on_progress=None, progress_interval=10000):
+        """
+        Create empty statistics for one search.
+        Args:
+            on_expand (function): Called with every state about to be expanded.
+            on_solution (function): Called with the goal state and these statistics when found.
+            on_progress (function): Called with these statistics every progress_interval expansions.
+            progress_interval (int): The number of expansions between on_progress calls.
+        """
+        self.on_expand = on_expand
+        self.on_solution = on_solution
+        self.on_progress = on_progress
+        self.progress_interval = progress_interval
+
+        self.nodes_expanded = 0
+        self.nodes_generated = 0
+        self.duplicates_skipped = 0
+        self.peak_open = 0
+        self.heuristic_time = 0.0
+        self.expansion_time = 0.0
+        self.queue_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.solution_length = None
+        self.start_time = perf_counter()
+        self.elapsed_time = 0.0
+
+    @property
+    def cache_hit_rate(self):
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else 0.0
+
+    def expanded(self, state):
+        """
+        Count an expansion and run the on_expand and on_progress hooks.
+        Args:
+            state: The state about to be expanded.
+        """
+        self.nodes_expanded += 1
+        if self.on_expand is not None:
+            self.on_expand(state)
+        if self.on_progress is not None and self.nodes_expanded % self.progress_interval == 0:
+            self.elapsed_time = perf_counter() - self.start_time
+            self.on_progress(self)
+
+    def solved(self, state, solution):
+        """
+        Record the solution and run the on_solution hook.
+        Args:
+            state: The goal state reached.
+            solution (list): The moves of the solution.
+        """
+        self.solution_length = len(solution)
+        self.finished()
+        if self.on_solution is not None:
+            self.on_solution(state, self)
+
+    def finished(self):
+        self.elapsed_time = perf_counter() - self.start_time
+
+    def as_dict(self):
+        """
+        Get the statistics as a dictionary (e.g. to log them as JSON).
+        Returns:
+            dict: The counters and timings.
+        """
+        return {
+            'nodes_expanded': self.nodes_expanded,
+            'nodes_generated': self.nodes_generated,
+            'duplicates_skipped': self.duplicates_skipped,
+            'peak_open': self.peak_open,
+            'heuristic_time': self.heuristic_time,
+            'expansion_time': self.expansion_time,
+            'queue_time': self.queue_time,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'cache_hit_rate': self.cache_hit_rate,
+            'solution_length': self.solution_length,
+            'elapsed_time': self.elapsed_time,
+        }
@@ -0,0 +1,107 @@
+# Lazy enumeration of the solvable states of the n x n puzzle by rank.
+# Solvable rank k picks the blank position and a permutation of the tiles directly,
+# so nothing is materialized, memory stays bounded by the chunk size and any rank
+# range can be enumerated on its own (e.g. one shard per process).
+#
+# Rank layout: k = blank * half + j, with half = (n*n - 1)! / 2. The tile permutations
+# 2j and 2j + 1 (in lexicographic order) only differ by swapping the last two tiles, so
+# exactly one of them has the parity that makes the board solvable with that blank.
+
+from math import factorial
+
+
+def count_solvable(n):
+    """
+    Number of solvable states of the n x n puzzle.
+    Args:
+        n (int): The size of the puzzle (n x n).
+    Returns:
+        int: (n * n)! / 2
+    """
+    return factorial(n * n) // 2
+
+
+def required_parity(blank, n):
+    """
+    Inversion parity the tiles must have for a board with the blank at a position to be solvable
+    (goal with the tiles in order and the blank last). A vertical move changes the inversions by
+    n - 1 and the blank row by one, so for odd n the parity never changes and for even n the
+    parity plus the blank row does.
+    Args:
+        blank (int): The position of the blank.
+        n (int): The size of the puzzle (n x n).
+    Returns:
+        int: 0 for an even number of inversions, 1 for odd.
+    """
+    if n % 2 == 1:
+        return 0
+    return (n - 1 - blank // n) % 2
+
+
+def unrank_tiles(rank, tiles):
+    """
+    Get the permutation of the tiles with a lexicographic rank, and its parity.
+    Args:
+        rank (int): The rank, in [0, len(tiles)!).
+        tiles (list): The tiles, in ascending order.
+    Returns:
+        tuple: The permuted tiles and the parity of their inversions.
+    """
+    remaining = list(tiles)
+    permutation = []
+    parity = 0
+    for i in range(len(tiles) - 1, -1, -1):
+        digit, rank = divmod(rank, factorial(i))
+        permutation.append(remaining.pop(digit))
+        parity ^= digit & 1  # Each Lehmer digit counts the inversions of one tile
+    return permutation, parity
+
+
+def unrank_solvable(rank, n):
+    """
+    Get the solvable state with a rank.
+    Args:
+        rank (int): The rank, in [0, count_solvable(n)).
+        n (int): The size of the puzzle (n x n).
+    Returns:
+        list: The puzzle state.
+    """
+    half = factorial(n * n - 1) // 2
+    blank, j = divmod(rank, half)
+    tiles = list(range(1, n * n))
+    permutation, parity = unrank_tiles(2 * j, tiles)
+    if parity != required_parity(blank, n):
+        permutation[-1], permutation[-2] = permutation[-2], permutation[-1]
+    permutation.insert(blank, 0)
+    return permutation
+
+
+def solvable_states(n, start=0, stop=None, chunk_size=10000):
+    """
+    Enumerate the solvable states with a rank in [start, stop), in chunks.
+    Args:
+        n (int): The size of the puzzle (n x n).
+        start (int): The first rank.
+        stop (int): The rank after the last one (count_solvable(n) if None).
+        chunk_size (int): The number of states per chunk.
+    Yields:
+        list: A chunk of puzzle states.
+    """
+    if stop is None:
+        stop = count_solvable(n)
+    for chunk_start in range(start, stop, chunk_size):
+        yield [unrank_solvable(rank, n) for rank in range(chunk_start, min(chunk_start + chunk_size, stop))]
+
+
+def shard_ranges(n, shards):
+    """
+    Split the ranks of the solvable states into contiguous ranges of about the same size.
+    Args:
+        n (int): The size of the puzzle (n x n).
+        shards (int): The number of ranges.
+    Returns:
+        list: The (start, stop) range of every shard.
+    """
+    total = count_solvable(n)
+    bounds = [total * i // shards for i in range(shards + 1)]
+    return list(zip(bounds[:-1], bounds[1:]))
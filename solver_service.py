@@ -0,0 +1,340 @@
+# Long-lived local solver service.
+# An asyncio front end speaks JSON over HTTP (TCP on localhost or a Unix socket) and hands
+# the boards to a pool of solver processes, which load their heuristic tables once and keep
+# them warm between requests.
+#
+#   POST /solve  {"state": [8, 1, 3, 4, 0, 2, 7, 6, 5], "n": 3, "heuristic": "m", "engine": "astar", "timeout": 10}
+#   GET  /stats  the counters of the service
+#
+# Identical requests in flight share one search. At most max_pending searches are queued or
+# running; further boards are refused with 503 instead of piling up. Every request has a
+# timeout that counts from its arrival: searches that run past it are stopped inside the
+# worker, and those still queued when it passes are dropped without being started.
+#
+# Example:
+#   python solver_service.py --port 8765
+#   curl -d '{"state": [8, 1, 3, 4, 0, 2, 7, 6, 5]}' http://127.0.0.1:8765/solve
+
+import argparse
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import json
+from time import perf_counter, time
+import urllib.error
+import urllib.request
+from astar import solvable
+from batch_solver import ENGINES, attach_worker
+from search_stats import SearchStats
+
+MAX_BODY = 64 * 1024  # Largest request body accepted, in bytes
+READ_TIMEOUT = 10.0  # Seconds a client has to send its whole request
+HEURISTICS = ('m', 'd', 'l', 'w')
+SIZES = (3, 4)  # The boards the engines and tables support
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 413: 'Payload Too Large',
+           422: 'Unprocessable Entity', 500: 'Internal Server Error', 503: 'Service Unavailable',
+           504: 'Gateway Timeout'}
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+def warm_worker(sizes, heuristics):
+    """
+    Prepare a worker process for every puzzle size and heuristic the service expects.
+    Args:
+        sizes (list): The puzzle sizes.
+        heuristics (list): The heuristics.
+    """
+    for n in sizes:
+        for heuristic in heuristics:
+            attach_worker(n, heuristic)
+
+
+def solve_with_deadline(state, n, heuristic, engine, deadline):
+    """
+    Solve a board inside a worker, giving up once the deadline of the request has passed.
+    A search that waited in the queue past its deadline is not started at all. The deadline
+    is checked by an on_progress hook every thousand expansions (the bidirectional search
+    takes no hooks and always runs to the end). The anytime search is given most of the
+    remaining time as its budget, and answers with its best solution so far.
+    Args:
+        state (list): The initial state of the puzzle.
+        n (int): The size of the puzzle (n x n).
+        heuristic (str): The heuristic to use ('m', 'd', 'l' or 'w').
+        engine (str): The search to use, from batch_solver.ENGINES.
+        deadline (float): The time (as returned by time.time) the request expires.
+    Returns:
+        tuple: The solution and the number of explored states (and the suboptimality bound
+            for the weighted and anytime searches).
+    Raises:
+        SearchTimeout: If the deadline passed before the search ended.
+    """
+    # Wall-clock time, as the deadline is set by another process
+    remaining = deadline - time()
+    if remaining <= 0:
+        raise SearchTimeout("Expired before the search started")
+    if engine == 'bidirectional':
+        return ENGINES[engine](state, n, heuristic=heuristic)
+    if engine == 'anytime':
+        return ENGINES[engine](state, n, heuristic=heuristic, time_limit=remaining * 0.9)
+
+    def check_deadline(stats):
+        if time() > deadline:
+            raise SearchTimeout("Gave up after {} expansions".format(stats.nodes_expanded))
+
+    stats = SearchStats(on_progress=check_deadline, progress_interval=1000)
+    return ENGINES[engine](state, n, heuristic=heuristic, stats=stats)
+
+
+def parse_solve_request(body):
+    """
+    Read and validate the JSON body of a /solve request.
+    Args:
+        body (bytes): The request body.
+    Returns:
+        dict: The state, n, heuristic, engine and timeout (None when not given).
+    Raises:
+        ValueError: If the body is not a valid request.
+    """
+    request = json.loads(body)
+    if not isinstance(request, dict):
+        raise ValueError("The body must be a JSON object")
+
+    state = request.get('state')
+    n = request.get('n', 3)
+    heuristic = request.get('heuristic', 'm')
+    engine = request.get('engine', 'astar')
+    timeout = request.get('timeout')
+
+    if not isinstance(n, int) or isinstance(n, bool) or n not in SIZES:
+        raise ValueError("n must be one of: {}".format(', '.join(map(str, SIZES))))
+    if not isinstance(state, list) or not all(isinstance(tile, int) and not isinstance(tile, bool) for tile in state) \
+            or sorted(state) != list(range(n * n)):
+        raise ValueError("state must hold every number from 0 to {} once".format(n * n - 1))
+    if heuristic not in HEURISTICS:
+        raise ValueError("heuristic must be one of: {}".format(', '.join(HEURISTICS)))
+    if engine not in ENGINES:
+        raise ValueError("engine must be one of: {}".format(', '.join(ENGINES)))
+    if timeout is not None and (not isinstance(timeout, (int, float)) or timeout <= 0):
+        raise ValueError("timeout must be a positive number of seconds")
+
+    return {'state': state, 'n': n, 'heuristic': heuristic, 'engine': engine, 'timeout': timeout}
+
+
+class SolverService:
+    def __init__(self, workers=None, max_pending=64, default_timeout=30.0, sizes=(3,), heuristics=('m',)):
+        """
+        Create the service and start its pool of solver processes.
+        Args:
+            workers (int): The number of solver processes (the number of CPUs if None).
+            max_pending (int): The number of distinct boards that may be queued or solving at once.
+            default_timeout (float): The timeout of requests that don't give one, in seconds.
+            sizes (list): The puzzle sizes the workers prepare for.
+            heuristics (list): The heuristics the workers prepare for.
+        """
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=warm_worker,
+                                            initargs=(list(sizes), list(heuristics)))
+        self.max_pending = max_pending
+        self.default_timeout = default_timeout
+        self.in_flight = {}  # Future of the search of every distinct board being solved
+        self.counters = dict.fromkeys(['requests', 'solved', 'coalesced', 'rejected', 'timeouts', 'errors'], 0)
+
+    def finish_search(self, key, future):
+        # Runs when a search ends, whether or not any request is still waiting for it
+        self.in_flight.pop(key, None)
+        if not future.cancelled():
+            future.exception()  # Mark the exception as retrieved if every waiter timed out
+
+    async def solve(self, state, n, heuristic, engine, timeout):
+        """
+        Solve a board in the pool, sharing the search with identical boards in flight.
+        Args:
+            state (list): The initial state of the puzzle.
+            n (int): The size of the puzzle (n x n).
+            heuristic (str): The heuristic to use.
+            engine (str): The search to use.
+            timeout (float): The number of seconds to wait, the default timeout if None.
+        Returns:
+            tuple: The HTTP status and the JSON response.
+        """
+        if timeout is None:
+            timeout = self.default_timeout
+        if not solvable(state, n):
+            return 422, {'error': 'The board is not solvable'}
+
+        start_time = perf_counter()
+        # Only requests with the same timeout share a search, which stops at the first one's deadline
+        key = (tuple(state), n, heuristic, engine, timeout)
+        future = self.in_flight.get(key)
+        coalesced = future is not None
+        if coalesced:
+            self.counters['coalesced'] += 1
+        else:
+            if len(self.in_flight) >= self.max_pending:
+                self.counters['rejected'] += 1
+                return 503, {'error': 'Too many boards in flight, retry later'}
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.executor, solve_with_deadline, state, n, heuristic, engine,
+                                          time() + timeout)
+            self.in_flight[key] = future
+            future.add_done_callback(lambda done: self.finish_search(key, done))
+
+        try:
+            # Shielded, so a waiter timing out never cancels the search shared with others
+            result = await asyncio.wait_for(asyncio.shield(future), timeout)
+        except (asyncio.TimeoutError, SearchTimeout):
+            self.counters['timeouts'] += 1
+            return 504, {'error': 'No solution within {} seconds'.format(timeout)}
+
+        if result is None:
+            return 422, {'error': 'No solution found'}
+        self.counters['solved'] += 1
+        response = {
+            'solution': result[0],
+            'length': len(result[0]),
+            'explored': result[1],
+            'elapsed_time': perf_counter() - start_time,
+            'coalesced': coalesced,
+        }
+        if len(result) > 2:
+            response['bound'] = result[2]  # Proven cost over optimal cost of the weighted searches
+        return 200, response
+
+    async def route(self, method, path, body):
+        """
+        Answer a request.
+        Args:
+            method (str): The HTTP method.
+            path (str): The requested path.
+            body (bytes): The request body.
+        Returns:
+            tuple: The HTTP status and the JSON response.
+        """
+        if method == 'GET' and path == '/stats':
+            return 200, dict(self.counters, in_flight=len(self.in_flight))
+        if method == 'POST' and path == '/solve':
+            try:
+                request = parse_solve_request(body)
+            except ValueError as error:  # json.JSONDecodeError is a ValueError too
+                return 400, {'error': str(error)}
+            return await self.solve(**request)
+        return 404, {'error': 'Unknown endpoint {} {}'.format(method, path)}
+
+    async def read_request(self, reader):
+        """
+        Read an HTTP request.
+        Args:
+            reader (asyncio.StreamReader): The connection.
+        Returns:
+            tuple: The method, the path and the body.
+        """
+        method, path, _ = (await reader.readline()).decode('latin-1').split(' ', 2)
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get('content-length', 0))
+        if length > MAX_BODY:
+            return method, path, None
+        body = await reader.readexactly(length) if length else b''
+        return method, path, body
+
+    async def handle(self, reader, writer):
+        """
+        Serve one connection: read a request, answer it with JSON and close.
+        Args:
+            reader (asyncio.StreamReader): The connection to read from.
+            writer (asyncio.StreamWriter): The connection to write to.
+        """
+        self.counters['requests'] += 1
+        try:
+            method, path, body = await asyncio.wait_for(self.read_request(reader), READ_TIMEOUT)
+            if body is None:
+                status, response = 413, {'error': 'The body is larger than {} bytes'.format(MAX_BODY)}
+            else:
+                status, response = await self.route(method, path, body)
+        except (ValueError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            status, response = 400, {'error': 'Malformed request'}
+        except Exception as error:
+            self.counters['errors'] += 1
+            status, response = 500, {'error': 'Internal error: {}'.format(error)}
+
+        payload = json.dumps(response).encode()
+        writer.write('HTTP/1.1 {} {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\n'
+                     'Connection: close\r\n\r\n'.format(status, REASONS[status], len(payload)).encode() + payload)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8765, unix_path=None):
+        """
+        Accept connections until cancelled.
+        Args:
+            host (str): The address to listen on.
+            port (int): The TCP port to listen on.
+            unix_path (str): A Unix socket to listen on instead of TCP.
+        """
+        if unix_path is not None:
+            server = await asyncio.start_unix_server(self.handle, unix_path)
+            print("Listening on {}".format(unix_path))
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+            print("Listening on http://{}:{}".format(host, port))
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+
+def request_solution(state, n=3, heuristic='m', engine='astar', timeout=None, url='http://127.0.0.1:8765'):
+    """
+    Ask a running service to solve a board.
+    Args:
+        state (list): The initial state of the puzzle.
+        n (int): The size of the puzzle (n x n).
+        heuristic (str): The heuristic to use.
+        engine (str): The search to use.
+        timeout (float): The timeout of the request, the default of the service if None.
+        url (str): The address of the service.
+    Returns:
+        tuple: The HTTP status and the JSON response.
+    """
+    request = {'state': state, 'n': n, 'heuristic': heuristic, 'engine': engine}
+    if timeout is not None:
+        request['timeout'] = timeout
+    http_request = urllib.request.Request(url + '/solve', data=json.dumps(request).encode(),
+                                          headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(http_request) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as error:
+        return error.code, json.load(error)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the sliding puzzle solvers over HTTP.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', default=None, help="listen on this Unix socket instead of TCP")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--max-pending', type=int, default=64)
+    parser.add_argument('--timeout', type=float, default=30.0, help="default timeout of a request, in seconds")
+    parser.add_argument('--sizes', default='3', help="comma-separated puzzle sizes to warm the workers for")
+    parser.add_argument('--heuristics', default='m', help="comma-separated heuristics to warm the workers for")
+    args = parser.parse_args()
+
+    service = SolverService(workers=args.workers, max_pending=args.max_pending, default_timeout=args.timeout,
+                            sizes=[int(n) for n in args.sizes.split(',')], heuristics=args.heuristics.split(','))
+    try:
+        asyncio.run(service.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        print("Service stopped.")
+    finally:
+        service.close()
@@ -0,0 +1,181 @@
+# Heuristic evaluation and solvability checks of whole batches of boards with NumPy.
+# Boards are given as a (k, n*n) integer array, one complete puzzle state per row,
+# and all k values are computed with array operations.
+
+import numpy as np
+from pattern_database import DisjointPatternDatabase
+
+
+def goal_coordinates(n):
+    """
+    Get the goal row and column of every tile of the complete goal state.
+    Args:
+        n (int): The size of the puzzle (n x n).
+    Returns:
+        tuple: Two arrays indexed by tile, with the goal row and the goal column.
+    """
+    goal = np.array(list(range(1, n * n)) + [0])
+    positions = np.empty(n * n, dtype=np.int64)
+    positions[goal] = np.arange(n * n)
+    return positions // n, positions % n
+
+
+def manhattan_batch(boards, n):
+    """
+    Calculate the Manhattan distance of every board.
+    Args:
+        boards (numpy.ndarray): A (k, n*n) array of puzzle states.
+        n (int): The size of the puzzle (n x n).
+    Returns:
+        numpy.ndarray: The k heuristic values.
+    """
+    boards = np.asarray(boards)
+    goal_rows, goal_cols = goal_coordinates(n)
+    cells = np.arange(n * n)
+    distances = np.abs(cells // n - goal_rows[boards]) + np.abs(cells % n - goal_cols[boards])
+    return np.where(boards != 0, distances, 0).sum(axis=1)
+
+
+def solvable_batch(boards, n):
+    """
+    Check which boards are solvable, for any n (see astar.solvable).
+    The parity of the tile inversions is counted one column at a time; for odd n it must be
+    even, and for even n it must match the parity of the rows between the blank and the last row.
+    Args:
+        boards (numpy.ndarray): A (k, n*n) array of puzzle states.
+        n (int): The size of the puzzle (n x n).
+    Returns:
+        numpy.ndarray: A boolean array, True for the solvable boards.
+    """
+    boards = np.asarray(boards)
+    parity = np.zeros(len(boards), dtype=np.int64)
+    for i in range(n * n - 1):
+        tile = boards[:, i:i + 1]
+        parity ^= ((tile > boards[:, i + 1:]) & (boards[:, i + 1:] != 0)).sum(axis=1) & 1
+    if n % 2 == 1:
+        return parity == 0
+    blank_rows = np.argmax(boards == 0, axis=1) // n
+    return parity == (n - 1 - blank_rows) % 2
+
+
+def line_conflicts(targets):
+    """
+    Count the tiles that must leave their line so the others can reach their goal.
+    It's the number of tiles in their goal line minus the longest increasing subsequence
+    of their goal positions, computed for all lines at once.
+    Args:
+        targets (numpy.ndarray): A (k, n) array with the goal position inside the line of
+            every tile that belongs to the line, and -1 for the others.
+    Returns:
+        numpy.ndarray: The k conflict counts.
+    """
+    k, n = targets.shape
+    valid = targets >= 0
+    longest = np.zeros((k, n), dtype=np.int64)
+    for j in range(n):
+        best = np.zeros(k, dtype=np.int64)
+        for i in range(j):
+            increasing = valid[:, i] & (targets[:, i] < targets[:, j])
+            best = np.maximum(best, np.where(increasing, longest[:, i], 0))
+        longest[:, j] = np.where(valid[:, j], best + 1, 0)
+    return valid.sum(axis=1) - longest.max(axis=1)
+
+
+def linear_conflict_batch(boards, n):
+    """
+    Calculate the Manhattan distance plus linear conflicts of every board.
+    Each tile that must leave its goal row (or column) to let the others pass adds two moves.
+    Args:
+        boards (numpy.ndarray): A (k, n*n) array of puzzle states.
+        n (int): The size of the puzzle (n x n).
+    Returns:
+        numpy.ndarray: The k heuristic values.
+    """
+    boards = np.asarray(boards)
+    goal_rows, goal_cols = goal_coordinates(n)
+    heuristic = manhattan_batch(boards, n)
+
+    for line in range(n):
+        row = boards[:, line * n:(line + 1) * n]
+        in_row = (row != 0) & (goal_rows[row] == line)
+        heuristic += 2 * line_conflicts(np.where(in_row, goal_cols[row], -1))
+
+        column = boards[:, line::n]
+        in_column = (column != 0) & (goal_cols[column] == line)
+        heuristic += 2 * line_conflicts(np.where(in_column, goal_rows[column], -1))
+
+    return heuristic
+
+
+def rank_positions_batch(positions, size):
+    """
+    Vectorized version of pattern_database.rank_positions.
+    Args:
+        positions (numpy.ndarray): A (k, m) array of distinct board positions per row.
+        size (int): The number of cells of the board (n * n).
+    Returns:
+        numpy.ndarray: The k ranks.
+    """
+    positions = np.asarray(positions, dtype=np.int64)
+    ranks = np.zeros(len(positions), dtype=np.int64)
+    for i in range(positions.shape[1]):
+        smaller = (positions[:, :i] < positions[:, i:i + 1]).sum(axis=1)
+        ranks = ranks * (size - i) + positions[:, i] - smaller
+    return ranks
+
+
+def pattern_database_batch(boards, database):
+    """
+    Look up the cost of one pattern for every board.
+    Args:
+        boards (numpy.ndarray): A (k, n*n) array of complete puzzle states.
+        database (PatternDatabase): The memory-mapped pattern database.
+    Returns:
+        numpy.ndarray: The k costs.
+    """
+    boards = np.asarray(boards)
+    where = np.argsort(boards, axis=1)  # where[:, tile] is the position of the tile
+    columns = list(database.tiles)
+    if database.with_blank:
+        columns.append(0)
+    ranks = rank_positions_batch(where[:, columns], database.size)
+
+    data = np.frombuffer(database.data, dtype=np.uint8, offset=database.offset)
+    if database.nibble:
+        values = data[ranks >> 1]
+        return np.where(ranks & 1, values >> 4, values & 15).astype(np.int64)
+    return data[ranks].astype(np.int64)
+
+
+def disjoint_pattern_database_batch(boards, databases):
+    """
+    Add the pattern costs of every board.
+    Args:
+        boards (numpy.ndarray): A (k, n*n) array of complete puzzle states.
+        databases (DisjointPatternDatabase): The databases of the partition.
+    Returns:
+        numpy.ndarray: The k heuristic values.
+    """
+    return sum(pattern_database_batch(boards, database) for database in databases.databases)
+
+
+def heuristic_batch(boards, n, heuristic='m', databases=None):
+    """
+    Evaluate a heuristic for a batch of boards.
+    Args:
+        boards (numpy.ndarray): A (k, n*n) array of complete puzzle states.
+        n (int): The size of the puzzle (n x n).
+        heuristic (str): 'm' for Manhattan, 'l' for linear conflict, 'd' for disjoint pattern database.
+        databases (DisjointPatternDatabase): The databases to use with 'd'.
+    Returns:
+        numpy.ndarray: The k heuristic values.
+    """
+    if heuristic == 'm':
+        return manhattan_batch(boards, n)
+    if heuristic == 'l':
+        return linear_conflict_batch(boards, n)
+    if heuristic == 'd':
+        if not isinstance(databases, DisjointPatternDatabase):
+            raise ValueError("The 'd' heuristic needs the DisjointPatternDatabase to read")
+        return disjoint_pattern_database_batch(boards, databases)
+    raise ValueError("Unknown heuristic: {}".format(heuristic))